@@ -46,6 +46,7 @@ import time
 import random
 import sys
 import platform
+from collections import namedtuple
 
 # Check pymodbus and pyserial installation
 try:
@@ -100,6 +101,12 @@ except ImportError as e:
     print("\n" + "=" * 70 + "\n")
     sys.exit(1)
 
+# Library versions for the banner (both imports succeeded above)
+import pymodbus as _pm
+
+_PYMODBUS_VERSION = getattr(_pm, "__version__", "Unknown")
+_PYSERIAL_VERSION = getattr(serial, "VERSION", "Unknown")
+
 # =============================================================================
 # Configuration (Match with Device_Testing/RTU/create_device_5_registers.py)
 # =============================================================================
@@ -117,17 +124,43 @@ SLAVE_ID = 1  # MUST match device config slave_id
 NUM_REGISTERS = 5  # 5 Input Registers
 
 # Register definitions (matching create_device_5_registers.py)
-REGISTER_INFO = {
-    0: {"name": "Temperature", "unit": "°C", "min": 20, "max": 35, "initial": 25},
-    1: {"name": "Humidity", "unit": "%", "min": 40, "max": 80, "initial": 60},
-    2: {"name": "Pressure", "unit": "Pa", "min": 900, "max": 1100, "initial": 1000},
-    3: {"name": "Voltage", "unit": "V", "min": 220, "max": 240, "initial": 230},
-    4: {"name": "Current", "unit": "A", "min": 1, "max": 10, "initial": 5},
-}
+RegInfo = namedtuple("RegInfo", "name unit min max initial")
+
+# Indexed by register address (immutable)
+REGISTER_INFO = (
+    RegInfo("Temperature", "°C", 20, 35, 25),
+    RegInfo("Humidity", "%", 40, 80, 60),
+    RegInfo("Pressure", "Pa", 900, 1100, 1000),
+    RegInfo("Voltage", "V", 220, 240, 230),
+    RegInfo("Current", "A", 1, 10, 5),
+)
+
+# Flat per-address bounds for the update loop
+REG_MIN = tuple(info.min for info in REGISTER_INFO)
+REG_MAX = tuple(info.max for info in REGISTER_INFO)
+
+# Constant datastore contents, built once at import
+_INITIAL_VALUES = tuple(info.initial for info in REGISTER_INFO)
+_ZERO_100 = (0,) * 100
+
+# Bound PRNG methods (skip the module attribute lookup per call)
+_rand = random.Random()
+_randrange = _rand.randrange
+_choice = _rand.choice
+
+# Per-address random-walk steps; None means a uniform step in -5..5
+_STEP_CHOICES = (
+    (-1, 0, 0, 1),  # Temperature: slow changes ±1°C
+    (-2, -1, 0, 1, 2),  # Humidity: moderate changes ±2%
+    None,  # Pressure: small changes ±5 Pa
+    (-1, 0, 0, 0, 1),  # Voltage: very stable ±1V
+    (-1, 0, 1),  # Current: changes ±1A
+)
 
 # Auto-update configuration
 AUTO_UPDATE = True
 UPDATE_INTERVAL = 5.0  # Update every 5 seconds (gateway polls every 2s)
+VERBOSE_EVERY_N = 10  # Full register dump every N updates (first update included)
 
 # =============================================================================
 # Logging Configuration
@@ -145,49 +178,38 @@ log = logging.getLogger(__name__)
 # =============================================================================
 def print_banner():
     """Display startup banner with configuration"""
-    try:
-        import pymodbus
-
-        pymodbus_version = f"{pymodbus.__version__} (API v{PYMODBUS_VERSION}.x)"
-    except:
-        pymodbus_version = f"Unknown (API v{PYMODBUS_VERSION}.x)"
-
-    try:
-        import serial
-
-        pyserial_version = serial.VERSION
-    except:
-        pyserial_version = "Unknown"
-
-    print("\n" + "=" * 70)
-    print("  MODBUS RTU SLAVE SIMULATOR")
-    print("  SRT-MGATE-1210 Testing - 5 Input Registers")
-    print("=" * 70)
-    print(f"  Serial Configuration:")
-    print(f"  - Port:           {SERIAL_PORT}")
-    print(f"  - Baud Rate:      {BAUD_RATE}")
-    print(f"  - Data Bits:      {DATA_BITS}")
-    print(f"  - Parity:         {PARITY} (None)")
-    print(f"  - Stop Bits:      {STOP_BITS}")
-    print(f"  - Frame Format:   RTU")
-    print(f"  - Flow Control:   RTS Toggle")
-    print(f"")
-    print(f"  Modbus Configuration:")
-    print(f"  - Slave ID:       {SLAVE_ID}")
-    print(f"  - Registers:      {NUM_REGISTERS} Input Registers (Function Code 4)")
-    print(f"  - Data Type:      INT16 (0-65535)")
-    print(f"  - Address Range:  0-{NUM_REGISTERS-1}")
-    print(f"")
-    print(f"  Auto Update:")
-    print(f"  - Enabled:        {'Yes' if AUTO_UPDATE else 'No'}")
-    print(f"  - Interval:       {UPDATE_INTERVAL}s")
-    print(f"")
-    print(f"  Libraries:")
-    print(f"  - PyModbus:       v{pymodbus_version}")
-    print(f"  - PySerial:       v{pyserial_version}")
-    print(f"  - Platform:       {platform.system()}")
-    print("=" * 70)
-    print("\n[INFO] Initializing Modbus RTU slave server...")
+    lines = [
+        "\n" + "=" * 70,
+        "  MODBUS RTU SLAVE SIMULATOR",
+        "  SRT-MGATE-1210 Testing - 5 Input Registers",
+        "=" * 70,
+        "  Serial Configuration:",
+        f"  - Port:           {SERIAL_PORT}",
+        f"  - Baud Rate:      {BAUD_RATE}",
+        f"  - Data Bits:      {DATA_BITS}",
+        f"  - Parity:         {PARITY} (None)",
+        f"  - Stop Bits:      {STOP_BITS}",
+        "  - Frame Format:   RTU",
+        "  - Flow Control:   RTS Toggle",
+        "",
+        "  Modbus Configuration:",
+        f"  - Slave ID:       {SLAVE_ID}",
+        f"  - Registers:      {NUM_REGISTERS} Input Registers (Function Code 4)",
+        "  - Data Type:      INT16 (0-65535)",
+        f"  - Address Range:  0-{NUM_REGISTERS-1}",
+        "",
+        "  Auto Update:",
+        f"  - Enabled:        {'Yes' if AUTO_UPDATE else 'No'}",
+        f"  - Interval:       {UPDATE_INTERVAL}s",
+        "",
+        "  Libraries:",
+        f"  - PyModbus:       v{_PYMODBUS_VERSION} (API v{PYMODBUS_VERSION}.x)",
+        f"  - PySerial:       v{_PYSERIAL_VERSION}",
+        f"  - Platform:       {platform.system()}",
+        "=" * 70,
+        "\n[INFO] Initializing Modbus RTU slave server...",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 # =============================================================================
@@ -223,13 +245,22 @@ def verify_serial_port():
         return True
 
     except Exception as e:
-        log.warning(f"Could not verify serial port: {e}")
+        log.warning("Could not verify serial port: %s", e)
         return True  # Continue anyway on Linux
 
 
 # =============================================================================
 # Auto-Update Thread
 # =============================================================================
+# Pre-rendered pieces of the per-tick display
+_LINE_PREFIX = tuple(
+    f"  [{addr}] {info.name:12s}: " for addr, info in enumerate(REGISTER_INFO)
+)
+_LINE_SUFFIX = tuple(f" {info.unit:4s}\n" for info in REGISTER_INFO)
+_RULE = "─" * 70 + "\n"
+_FOOTER = _RULE + f"[INFO] Waiting for Modbus RTU requests on {SERIAL_PORT}...\n\n"
+
+
 class RegisterUpdater(threading.Thread):
     """Thread to automatically update register values with realistic simulation"""
 
@@ -237,85 +268,88 @@ class RegisterUpdater(threading.Thread):
         super().__init__()
         self.context = context
         self.slave_id = slave_id
-        self.running = True
         self.daemon = True
         self.update_count = 0
+        self._stop_event = threading.Event()
 
     def run(self):
         """Main update loop"""
         log.info("Auto-update thread started")
 
-        while self.running:
-            try:
-                time.sleep(UPDATE_INTERVAL)
+        # Get the slave context (stable for the lifetime of the server)
+        slave_context = self.context[self.slave_id]
+
+        # Deadline-based schedule so work time does not stretch the period
+        next_tick = time.monotonic() + UPDATE_INTERVAL
 
-                # Get the slave context
-                slave_context = self.context[self.slave_id]
+        while not self._stop_event.is_set():
+            try:
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    # Event wait returns early (True) as soon as stop() is called
+                    if self._stop_event.wait(delay):
+                        break
+                elif delay < -UPDATE_INTERVAL:
+                    # Fell more than a period behind: resync instead of bursting
+                    next_tick = time.monotonic()
+                next_tick += UPDATE_INTERVAL
+
+                # Read all Input Registers (function code 4) in one call
+                new_values = list(slave_context.getValues(4, 0, count=NUM_REGISTERS))
 
                 # Update each register with realistic variations
                 for address in range(NUM_REGISTERS):
-                    info = REGISTER_INFO[address]
-
-                    # Get current value (function code 4 = Input Registers)
-                    current_value = slave_context.getValues(4, address, count=1)[0]
-
                     # Simulate realistic sensor variations
-                    if address == 0:  # Temperature: slow changes ±1°C
-                        new_value = current_value + random.choice([-1, 0, 0, 1])
-                        new_value = max(info["min"], min(info["max"], new_value))
-
-                    elif address == 1:  # Humidity: moderate changes ±2%
-                        new_value = current_value + random.choice([-2, -1, 0, 1, 2])
-                        new_value = max(info["min"], min(info["max"], new_value))
-
-                    elif address == 2:  # Pressure: small changes ±5 Pa
-                        new_value = current_value + random.randint(-5, 5)
-                        new_value = max(info["min"], min(info["max"], new_value))
-
-                    elif address == 3:  # Voltage: very stable ±1V
-                        new_value = current_value + random.choice([-1, 0, 0, 0, 1])
-                        new_value = max(info["min"], min(info["max"], new_value))
+                    choices = _STEP_CHOICES[address]
+                    if choices is None:
+                        change = _randrange(-5, 6)
+                    else:
+                        change = _choice(choices)
 
-                    elif address == 4:  # Current: changes ±1A
-                        new_value = current_value + random.choice([-1, 0, 1])
-                        new_value = max(info["min"], min(info["max"], new_value))
+                    new_value = new_values[address] + change
+                    new_value = max(REG_MIN[address], min(REG_MAX[address], new_value))
 
-                    else:
-                        new_value = current_value
+                    new_values[address] = new_value
 
-                    # Set new value
-                    slave_context.setValues(4, address, [new_value])
+                # Write the whole block back in one call
+                slave_context.setValues(4, 0, new_values)
 
                 self.update_count += 1
 
-                # Log updated values
-                values = slave_context.getValues(4, 0, count=NUM_REGISTERS)
-                log.info(f"Update #{self.update_count:04d} - Values: {values}")
-
-                # Print detailed values every update
-                print(f"\n{'─'*70}")
-                print(
-                    f"  Update #{self.update_count:04d} - Register Values (Slave ID: {SLAVE_ID}):"
-                )
-                print(f"{'─'*70}")
-                for addr in range(NUM_REGISTERS):
-                    info = REGISTER_INFO[addr]
-                    value = values[addr]
-                    print(
-                        f"  [{addr}] {info['name']:12s}: {value:5d} {info['unit']:4s}"
+                # Log updated values (new_values already holds the written state)
+                if log.isEnabledFor(logging.INFO):
+                    log.info("Update #%04d", self.update_count)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(
+                        "Update #%04d - Values: %s", self.update_count, new_values
                     )
-                print(f"{'─'*70}")
-                print(f"[INFO] Waiting for Modbus RTU requests on {SERIAL_PORT}...\n")
 
-            except Exception as e:
-                log.error(f"Error in auto-update thread: {e}")
-                import traceback
+                if (self.update_count - 1) % VERBOSE_EVERY_N:
+                    continue
+
+                # Print detailed values every Nth update (one write per tick)
+                buf = [
+                    "\n",
+                    _RULE,
+                    f"  Update #{self.update_count:04d} - Register Values (Slave ID: {SLAVE_ID}):\n",
+                    _RULE,
+                ]
+                buf.extend(
+                    f"{_LINE_PREFIX[addr]}{new_values[addr]:5d}{_LINE_SUFFIX[addr]}"
+                    for addr in range(NUM_REGISTERS)
+                )
+                buf.append(_FOOTER)
+                sys.stdout.write("".join(buf))
+                sys.stdout.flush()
 
-                traceback.print_exc()
+            except Exception:
+                log.exception("Error in auto-update thread")
+                # Back off so a persistent error does not spin the thread
+                self._stop_event.wait(1.0)
 
     def stop(self):
         """Stop the update thread"""
-        self.running = False
+        self._stop_event.set()
 
 
 # =============================================================================
@@ -335,17 +369,15 @@ def run_server():
             print("[INFO] Exiting...")
             sys.exit(1)
 
-    # Create initial values for Input Registers
-    initial_values = [REGISTER_INFO[i]["initial"] for i in range(NUM_REGISTERS)]
-
     # Create data blocks for Input Registers (function code 4)
-    input_registers = ModbusSequentialDataBlock(0, initial_values)  # Starting address
+    # Starting address 0, copied from the constant initial values
+    input_registers = ModbusSequentialDataBlock(0, list(_INITIAL_VALUES))
 
     # Create slave context with only Input Registers
     slave_context = ModbusSlaveContext(
-        di=ModbusSequentialDataBlock(0, [0] * 100),  # Discrete Inputs (not used)
-        co=ModbusSequentialDataBlock(0, [0] * 100),  # Coils (not used)
-        hr=ModbusSequentialDataBlock(0, [0] * 100),  # Holding Registers (not used)
+        di=ModbusSequentialDataBlock(0, list(_ZERO_100)),  # Discrete Inputs (not used)
+        co=ModbusSequentialDataBlock(0, list(_ZERO_100)),  # Coils (not used)
+        hr=ModbusSequentialDataBlock(0, list(_ZERO_100)),  # Holding Regs (not used)
         ir=input_registers,  # Input Registers (USED)
         zero_mode=True,  # Use 0-based addressing
     )
@@ -354,33 +386,37 @@ def run_server():
     server_context = ModbusServerContext(slaves={SLAVE_ID: slave_context}, single=False)
 
     # Display initial register values
-    print("\n" + "=" * 70)
-    print("  INITIAL REGISTER VALUES (Input Registers)")
-    print("=" * 70)
-    print(f"  {'Addr':<6} {'Name':<15} {'Value':<10} {'Unit':<10} {'Range':<20}")
-    print("─" * 70)
-    for addr in range(NUM_REGISTERS):
-        info = REGISTER_INFO[addr]
-        value = info["initial"]
-        range_str = f"{info['min']}-{info['max']}"
-        print(
-            f"  {addr:<6} {info['name']:<15} {value:<10} {info['unit']:<10} {range_str:<20}"
-        )
-    print("=" * 70)
-
-    print(f"\n[INFO] Server listening on {SERIAL_PORT}")
-    print(
-        f"[INFO] Baud Rate: {BAUD_RATE}, Format: {DATA_BITS}{PARITY}{STOP_BITS}, Framer: RTU"
+    lines = [
+        "\n" + "=" * 70,
+        "  INITIAL REGISTER VALUES (Input Registers)",
+        "=" * 70,
+        f"  {'Addr':<6} {'Name':<15} {'Value':<10} {'Unit':<10} {'Range':<20}",
+        "─" * 70,
+    ]
+    lines.extend(
+        f"  {addr:<6} {info.name:<15} {info.initial:<10} {info.unit:<10} "
+        f"{str(info.min) + '-' + str(info.max):<20}"
+        for addr, info in enumerate(REGISTER_INFO)
     )
-    print(f"[INFO] Slave ID: {SLAVE_ID}")
-    print(f"[INFO] Function Code: 4 (Read Input Registers)")
-    print(f"[INFO] Register Addresses: 0-{NUM_REGISTERS-1}")
-    print(f"\n[INFO] Ready for connections from SRT-MGATE-1210 Gateway")
-    print(f"[INFO] Gateway should be configured with:")
-    print(f"       - Serial Port: COM8 or Serial Port 2 on ESP32")
-    print(f"       - Baud: 9600, 8N1, RTU mode")
-    print(f"       - Slave ID: 1")
-    print(f"\n[INFO] Press Ctrl+C to stop server\n")
+    lines.append("=" * 70)
+
+    # Ready message
+    lines += [
+        f"\n[INFO] Server listening on {SERIAL_PORT}",
+        f"[INFO] Baud Rate: {BAUD_RATE}, Format: {DATA_BITS}{PARITY}{STOP_BITS}, Framer: RTU",
+        f"[INFO] Slave ID: {SLAVE_ID}",
+        "[INFO] Function Code: 4 (Read Input Registers)",
+        f"[INFO] Register Addresses: 0-{NUM_REGISTERS-1}",
+        "\n[INFO] Ready for connections from SRT-MGATE-1210 Gateway",
+        "[INFO] Gateway should be configured with:",
+        "       - Serial Port: COM8 or Serial Port 2 on ESP32",
+        "       - Baud: 9600, 8N1, RTU mode",
+        "       - Slave ID: 1",
+        "\n[INFO] Press Ctrl+C to stop server\n",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+    # stdout is block-buffered (see __main__); show startup output now
+    sys.stdout.flush()
 
     # Start auto-update thread if enabled
     updater = None
@@ -395,8 +431,8 @@ def run_server():
     try:
         # Start RTU Serial server (blocks until stopped)
         # Compatibility for pymodbus 2.x and 3.x
-        log.info(f"Starting Modbus RTU server on {SERIAL_PORT}...")
-        log.info(f"Using pymodbus {PYMODBUS_VERSION}.x API")
+        log.info("Starting Modbus RTU server on %s...", SERIAL_PORT)
+        log.info("Using pymodbus %d.x API", PYMODBUS_VERSION)
 
         if PYMODBUS_VERSION == 3:
             # pymodbus 3.x API
@@ -427,14 +463,11 @@ def run_server():
         print("\n\n[INFO] Shutting down server...")
         if updater:
             updater.stop()
-            updater.join(timeout=2)
+            updater.join()
         print("[INFO] Server stopped gracefully")
 
     except Exception as e:
-        log.error(f"Server error: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception("Server error")
         if updater:
             updater.stop()
 
@@ -458,6 +491,10 @@ def run_server():
 # Main Entry Point
 # =============================================================================
 if __name__ == "__main__":
+    # Block-buffer stdout; the updater flushes once per displayed tick
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
     print("\n" + "=" * 70)
     print("  MODBUS RTU SLAVE SIMULATOR")
     print("  SRT-MGATE-1210 Firmware Testing Tool")
@@ -471,11 +508,8 @@ if __name__ == "__main__":
     print(f"  └─ Addresses:    0-{NUM_REGISTERS-1}")
 
     print(f"\n  Register Mapping:")
-    for addr in range(NUM_REGISTERS):
-        info = REGISTER_INFO[addr]
-        print(
-            f"  [{addr}] {info['name']:12s} - {info['unit']:4s} ({info['min']}-{info['max']})"
-        )
+    for addr, info in enumerate(REGISTER_INFO):
+        print(f"  [{addr}] {info.name:12s} - {info.unit:4s} ({info.min}-{info.max})")
 
     print(f"\n  Gateway Configuration (use in Device_Testing/RTU):")
     print(f"  ├─ Serial Port:  COM8 (or Port 2 on ESP32)")
@@ -41,7 +41,6 @@ from ble_common import (
     print_warning,
     print_info,
     print_data,
-    print_progress_bar,
     print_table,
     print_box,
     print_summary,
@@ -144,11 +143,11 @@ async def main():
         print_section(f"Step 3: Create {NUM_REGISTERS} Registers", "📝")
 
         print_info(f"Creating {NUM_REGISTERS} Input Registers for device {device_id}")
-        print_info("Using 0.5s delay between registers")
+        print_info("Sending them in sequential batch commands")
         print()
 
-        for idx, reg in enumerate(REGISTERS, 1):
-            register_config = {
+        register_configs = [
+            {
                 "address": reg["address"],
                 "register_name": reg["name"],
                 "type": "Input Registers",
@@ -159,26 +158,19 @@ async def main():
                 "scale": 1.0,
                 "offset": 0.0,
             }
+            for reg in REGISTERS
+        ]
 
-            # Progress bar
-            progress = int((idx / NUM_REGISTERS) * 100)
-            print_progress_bar(progress, prefix=f"Register {idx}/{NUM_REGISTERS}")
-
-            result = await client.create_register(
-                device_id, register_config, reg["name"]
-            )
+        # One round trip per batch instead of one per register
+        results = await client.create_registers_batch(device_id, register_configs)
 
+        for reg, result in zip(REGISTERS, results):
             if result:
                 success_count += 1
             else:
                 failed_count += 1
-                print()
                 print_warning(f"Failed: {reg['name']} (Address: {reg['address']})")
 
-            await asyncio.sleep(0.5)
-
-        print()  # New line after progress bar
-
         # =====================================================================
         # Summary
         # =====================================================================
@@ -192,7 +184,7 @@ async def main():
         for idx, reg in enumerate(REGISTERS):
             status = (
                 f"{Fore.GREEN}OK{Style.RESET_ALL}"
-                if idx < success_count
+                if results[idx]
                 else f"{Fore.RED}FAIL{Style.RESET_ALL}"
             )
             rows.append(
@@ -201,7 +193,7 @@ async def main():
                     reg["address"],
                     reg["name"][:20],
                     reg["unit"],
-                    "OK" if idx < success_count else "FAIL",
+                    "OK" if results[idx] else "FAIL",
                 ]
             )
 
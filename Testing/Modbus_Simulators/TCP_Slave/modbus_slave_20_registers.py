@@ -24,12 +24,15 @@ Usage:
 =============================================================================
 """
 
+import array
+import asyncio
 import logging
 import threading
 import time
 import random
 import sys
 import os
+from collections import namedtuple
 
 # Add parent directory to path for shared module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -89,7 +92,7 @@ except ImportError:
 try:
     # Try pymodbus 3.x first
     try:
-        from pymodbus.server import StartTcpServer
+        from pymodbus.server import StartAsyncTcpServer
 
         PYMODBUS_VERSION = 3
     except ImportError:
@@ -110,6 +113,38 @@ except ImportError as e:
     print_info("Install with: pip install pymodbus")
     sys.exit(1)
 
+# Optional: numpy vectorizes the per-tick random walk
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Guards the input register block. Reentrant because the updater holds it
+# across its own getValues/setValues calls.
+_DB_LOCK = threading.RLock()
+
+
+class U16DataBlock(ModbusSequentialDataBlock):
+    """Sequential block stored as a contiguous array('H') instead of a list"""
+
+    def __init__(self, address, values):
+        super().__init__(address, values)
+        self.values = array.array("H", self.values)
+
+    def getValues(self, address, count=1):
+        with _DB_LOCK:
+            return super().getValues(address, count)
+
+    def setValues(self, address, values):
+        if not isinstance(values, (list, tuple, array.array)):
+            values = [values]
+        start = address - self.address
+        with _DB_LOCK:
+            self.values[start : start + len(values)] = array.array("H", values)
+
 
 # =============================================================================
 # Configuration
@@ -134,33 +169,58 @@ SERVER_PORT = 502
 SLAVE_ID = 1
 NUM_REGISTERS = 20
 
-# Register definitions
-REGISTER_INFO = {
-    0: {"name": "Temp_Zone_1", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    1: {"name": "Temp_Zone_2", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    2: {"name": "Temp_Zone_3", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    3: {"name": "Temp_Zone_4", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    4: {"name": "Temp_Zone_5", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    5: {"name": "Temp_Zone_6", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    6: {"name": "Temp_Zone_7", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    7: {"name": "Temp_Zone_8", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    8: {"name": "Temp_Zone_9", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    9: {"name": "Temp_Zone_10", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    10: {"name": "Temp_Zone_11", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    11: {"name": "Temp_Zone_12", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    12: {"name": "Temp_Zone_13", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    13: {"name": "Temp_Zone_14", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    14: {"name": "Temp_Zone_15", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    15: {"name": "Temp_Zone_16", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    16: {"name": "Temp_Zone_17", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    17: {"name": "Temp_Zone_18", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    18: {"name": "Temp_Zone_19", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-    19: {"name": "Temp_Zone_20", "unit": "degC", "min": 20, "max": 35, "initial": 25},
-}
+# Register definitions (immutable records)
+RegInfo = namedtuple("RegInfo", "name unit min max initial")
+
+# Indexed by register address
+REGISTER_INFO = (
+    RegInfo("Temp_Zone_1", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_2", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_3", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_4", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_5", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_6", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_7", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_8", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_9", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_10", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_11", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_12", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_13", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_14", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_15", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_16", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_17", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_18", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_19", "degC", 20, 35, 25),
+    RegInfo("Temp_Zone_20", "degC", 20, 35, 25),
+)
+
+# Flat per-address bounds for the update loop
+REG_MIN = tuple(info.min for info in REGISTER_INFO)
+REG_MAX = tuple(info.max for info in REGISTER_INFO)
+
+# Constant datastore contents, built once at import
+_INITIAL_VALUES = tuple(info.initial for info in REGISTER_INFO)
+_ZERO_100 = (0,) * 100
+
+# Random-walk steps (0 listed twice so values tend to hold)
+WALK_STEPS = (-2, -1, 0, 0, 1, 2)
+
+# Bound PRNG methods (skip the module attribute lookup per call)
+_rand = random.Random()
+_choice = _rand.choice
+
+if NUMPY_AVAILABLE:
+    _RNG = np.random.default_rng()
+    _STEP_ARR = np.array(WALK_STEPS, dtype=np.int32)
+    _MIN_ARR = np.array(REG_MIN, dtype=np.int32)
+    _MAX_ARR = np.array(REG_MAX, dtype=np.int32)
 
 # Auto-update configuration
 AUTO_UPDATE = True
 UPDATE_INTERVAL = 2.0
+VERBOSE_EVERY_N = 10  # Full register dump every N updates (first update included)
 
 # =============================================================================
 # Logging
@@ -174,72 +234,147 @@ log = logging.getLogger(__name__)
 
 
 # =============================================================================
-# Register Updater Thread
+# Register Updater
 # =============================================================================
+# Pre-rendered pieces of the per-tick display (first 10 registers shown)
+DISPLAY_COUNT = min(10, NUM_REGISTERS)
+_LINE_PREFIX = tuple(
+    f"  [{addr:2d}] {info.name[:15]:<15s}: "
+    for addr, info in enumerate(REGISTER_INFO[:DISPLAY_COUNT])
+)
+_LINE_SUFFIX = tuple(f" {info.unit}\n" for info in REGISTER_INFO[:DISPLAY_COUNT])
+_RULE = f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}\n"
+_MORE = f"  ... and {NUM_REGISTERS - 10} more registers\n" if NUM_REGISTERS > 10 else ""
+_FOOTER = (
+    _RULE
+    + f"  {Fore.GREEN}Waiting for Modbus TCP requests on {SERVER_IP}:{SERVER_PORT}...{Style.RESET_ALL}\n\n"
+)
+
+
 class RegisterUpdater(threading.Thread):
-    """Thread to automatically update register values"""
+    """Automatically update register values
+
+    pymodbus 2.x: runs as a daemon thread next to the blocking server.
+    pymodbus 3.x: run_async() runs as a task on the server's event loop.
+    """
 
     def __init__(self, context, slave_id):
         super().__init__()
-        self.context = context
-        self.slave_id = slave_id
-        self.running = True
+        # Slave context is stable for the lifetime of the server
+        self.slave_context = context[slave_id]
+        self._stop_event = threading.Event()
         self.daemon = True
         self.update_count = 0
 
+    def update_once(self):
+        """Advance every register one random-walk step and display the result"""
+        slave_context = self.slave_context
+
+        # Read the whole block once, update in place, write it back once.
+        # The lock makes the read-modify-write atomic with respect to server reads.
+        with _DB_LOCK:
+            new_values = list(slave_context.getValues(4, 0, count=NUM_REGISTERS))
+
+            # Update each register with realistic variations
+            if NUMPY_AVAILABLE:
+                # Random walk within bounds, all registers in one pass
+                current = np.asarray(new_values, dtype=np.int32)
+                current += _RNG.choice(_STEP_ARR, size=NUM_REGISTERS)
+                np.clip(current, _MIN_ARR, _MAX_ARR, out=current)
+                new_values = current.tolist()
+            else:
+                for address in range(NUM_REGISTERS):
+                    # Random walk within bounds
+                    change = _choice(WALK_STEPS)
+                    new_value = new_values[address] + change
+                    new_values[address] = max(
+                        REG_MIN[address], min(REG_MAX[address], new_value)
+                    )
+
+            slave_context.setValues(4, 0, new_values)
+
+        self.update_count += 1
+
+        if log.isEnabledFor(logging.INFO):
+            log.info("Update #%04d", self.update_count)
+
+        if (self.update_count - 1) % VERBOSE_EVERY_N:
+            return
+
+        # Display update (assembled and written in one call)
+        buf = [
+            "\n",
+            _RULE,
+            f"  {Fore.WHITE}{Style.BRIGHT}Update #{self.update_count:04d} - Slave ID: {SLAVE_ID}{Style.RESET_ALL}\n",
+            _RULE,
+        ]
+        buf.extend(
+            f"{_LINE_PREFIX[addr]}{new_values[addr]:5d}{_LINE_SUFFIX[addr]}"
+            for addr in range(DISPLAY_COUNT)
+        )
+        buf.append(_MORE)
+        buf.append(_FOOTER)
+        sys.stdout.write("".join(buf))
+        sys.stdout.flush()
+
     def run(self):
         log.info("Auto-update thread started")
 
-        while self.running:
-            try:
-                time.sleep(UPDATE_INTERVAL)
+        # Deadline-based schedule so work time does not stretch the period
+        next_tick = time.monotonic() + UPDATE_INTERVAL
 
-                slave_context = self.context[self.slave_id]
+        while not self._stop_event.is_set():
+            try:
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    # Event wait returns early (True) as soon as stop() is called
+                    if self._stop_event.wait(delay):
+                        break
+                elif delay < -UPDATE_INTERVAL:
+                    # Fell more than a period behind: resync instead of bursting
+                    next_tick = time.monotonic()
+                next_tick += UPDATE_INTERVAL
+
+                self.update_once()
+
+            except Exception:
+                log.exception("Error in auto-update thread")
+
+    async def run_async(self):
+        """Coroutine variant of run(); stopped by cancelling its task"""
+        log.info("Auto-update task started")
+
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + UPDATE_INTERVAL
+
+        while True:
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -UPDATE_INTERVAL:
+                # Fell more than a period behind: resync instead of bursting
+                next_tick = loop.time()
+            next_tick += UPDATE_INTERVAL
 
-                # Update each register with realistic variations
-                for address in range(NUM_REGISTERS):
-                    if address in REGISTER_INFO:
-                        info = REGISTER_INFO[address]
-                        current_value = slave_context.getValues(4, address, count=1)[0]
-
-                        # Random walk within bounds
-                        change = random.choice([-2, -1, 0, 0, 1, 2])
-                        new_value = current_value + change
-                        new_value = max(info["min"], min(info["max"], new_value))
-
-                        slave_context.setValues(4, address, [new_value])
-
-                self.update_count += 1
-
-                # Display update
-                values = slave_context.getValues(4, 0, count=NUM_REGISTERS)
-                print(f"\n{Fore.CYAN}{'='*70}{Style.RESET_ALL}")
-                print(
-                    f"  {Fore.WHITE}{Style.BRIGHT}Update #{self.update_count:04d} - Slave ID: {SLAVE_ID}{Style.RESET_ALL}"
-                )
-                print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}")
-
-                for addr in range(min(10, NUM_REGISTERS)):  # Show first 10
-                    if addr in REGISTER_INFO:
-                        info = REGISTER_INFO[addr]
-                        value = values[addr]
-                        print(
-                            f"  [{addr:2d}] {info['name'][:15]:<15s}: {value:5d} {info['unit']}"
-                        )
-
-                if NUM_REGISTERS > 10:
-                    print(f"  ... and {NUM_REGISTERS - 10} more registers")
-
-                print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}")
-                print(
-                    f"  {Fore.GREEN}Waiting for Modbus TCP requests on {SERVER_IP}:{SERVER_PORT}...{Style.RESET_ALL}\n"
-                )
-
-            except Exception as e:
-                log.error(f"Update error: {e}")
+            try:
+                self.update_once()
+            except Exception:
+                log.exception("Error in auto-update task")
 
     def stop(self):
-        self.running = False
+        self._stop_event.set()
+
+
+async def serve_async(server_context, updater):
+    """pymodbus 3.x: run the TCP server and the updater on one event loop"""
+    task = asyncio.create_task(updater.run_async()) if updater else None
+    try:
+        await StartAsyncTcpServer(
+            context=server_context, address=(SERVER_IP, SERVER_PORT)
+        )
+    finally:
+        if task:
+            task.cancel()
 
 
 # =============================================================================
@@ -278,16 +413,13 @@ def run_server():
         print(f"  Slave ID: {SLAVE_ID}")
         print(f"  Registers: {NUM_REGISTERS}")
 
-    # Create initial values
-    initial_values = [REGISTER_INFO[i]["initial"] for i in range(NUM_REGISTERS)]
-
-    # Create data blocks
-    input_registers = ModbusSequentialDataBlock(0, initial_values)
+    # Create data blocks (each block copies the constant contents)
+    input_registers = U16DataBlock(0, _INITIAL_VALUES)
 
     slave_context = ModbusSlaveContext(
-        di=ModbusSequentialDataBlock(0, [0] * 100),
-        co=ModbusSequentialDataBlock(0, [0] * 100),
-        hr=ModbusSequentialDataBlock(0, [0] * 100),
+        di=ModbusSequentialDataBlock(0, list(_ZERO_100)),
+        co=ModbusSequentialDataBlock(0, list(_ZERO_100)),
+        hr=ModbusSequentialDataBlock(0, list(_ZERO_100)),
         ir=input_registers,
         zero_mode=True,
     )
@@ -306,13 +438,7 @@ def run_server():
     for addr in range(min(15, NUM_REGISTERS)):
         info = REGISTER_INFO[addr]
         rows.append(
-            [
-                addr,
-                info["name"][:15],
-                info["initial"],
-                info["unit"],
-                f"{info['min']}-{info['max']}",
-            ]
+            [addr, info.name[:15], info.initial, info.unit, f"{info.min}-{info.max}"]
         )
 
     if COMMON_AVAILABLE:
@@ -320,17 +446,21 @@ def run_server():
 
         print_table(headers, rows)
     else:
-        for row in rows:
-            print(f"  [{row[0]:2d}] {row[1]:<15s}: {row[2]:5d} {row[3]}")
+        print(
+            "\n".join(
+                f"  [{row[0]:2d}] {row[1]:<15s}: {row[2]:5d} {row[3]}" for row in rows
+            )
+        )
 
     if NUM_REGISTERS > 15:
         print(f"  ... and {NUM_REGISTERS - 15} more registers")
 
-    # Start auto-update thread
+    # Start auto-update (thread on pymodbus 2.x, task on the server loop for 3.x)
     updater = None
     if AUTO_UPDATE:
         updater = RegisterUpdater(server_context, SLAVE_ID)
-        updater.start()
+        if PYMODBUS_VERSION == 2:
+            updater.start()
         (
             print_info(f"Auto-update enabled ({UPDATE_INTERVAL}s interval)")
             if COMMON_AVAILABLE
@@ -344,19 +474,29 @@ def run_server():
         print(f"\n[INFO] Server ready on {SERVER_IP}:{SERVER_PORT}")
         print("[INFO] Press Ctrl+C to stop")
 
+    # stdout is block-buffered (see __main__); show startup output now
+    sys.stdout.flush()
+
     try:
         log.info(
-            f"Starting TCP server on {SERVER_IP}:{SERVER_PORT} (pymodbus {PYMODBUS_VERSION}.x)"
+            "Starting TCP server on %s:%d (pymodbus %d.x)",
+            SERVER_IP,
+            SERVER_PORT,
+            PYMODBUS_VERSION,
         )
-        StartTcpServer(context=server_context, address=(SERVER_IP, SERVER_PORT))
+        if PYMODBUS_VERSION == 3:
+            asyncio.run(serve_async(server_context, updater))
+        else:
+            StartTcpServer(context=server_context, address=(SERVER_IP, SERVER_PORT))
     except KeyboardInterrupt:
         print("\n\n[INFO] Shutting down...")
         if updater:
             updater.stop()
-            updater.join(timeout=2)
+            if updater.is_alive():
+                updater.join()
         print("[INFO] Server stopped")
     except Exception as e:
-        log.error(f"Server error: {e}")
+        log.error("Server error: %s", e)
         if updater:
             updater.stop()
         raise
@@ -366,6 +506,10 @@ def run_server():
 # Main
 # =============================================================================
 if __name__ == "__main__":
+    # Block-buffer stdout; the updater flushes once per displayed tick
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
     print()
     print("=" * 60)
     print(f"  Modbus TCP Slave Simulator - {NUM_REGISTERS} Registers")
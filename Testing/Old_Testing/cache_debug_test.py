@@ -9,6 +9,11 @@ import json
 from bleak import BleakClient, BleakScanner
 
 
+def _is_gateway(device, adv):
+    """Scanner filter: stops the scan at the first matching advertisement"""
+    return bool(device.name) and "SURIOTA" in device.name
+
+
 class CacheDebugTester:
     def __init__(self):
         self.client = None
@@ -16,8 +21,7 @@ class CacheDebugTester:
 
     async def connect(self):
         print("Scanning for SURIOTA CRUD Service...")
-        devices = await BleakScanner.discover()
-        device = next((d for d in devices if d.name and "SURIOTA" in d.name), None)
+        device = await BleakScanner.find_device_by_filter(_is_gateway, timeout=5.0)
 
         if device:
             print(f"Found device: {device.name} ({device.address})")
@@ -47,13 +51,13 @@ class CacheDebugTester:
     async def send_command(self, command):
         json_str = json.dumps(command, separators=(",", ":"))
         print(f"Sending: {json_str}")
+        payload = json_str.encode("utf-8")  # Encode once, slice bytes below
 
         # Send with fragmentation
         chunk_size = 18
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i : i + chunk_size]
+        for i in range(0, len(payload), chunk_size):
             await self.client.write_gatt_char(
-                "11111111-1111-1111-1111-111111111101", chunk.encode()
+                "11111111-1111-1111-1111-111111111101", payload[i : i + chunk_size]
             )
             await asyncio.sleep(0.1)
 
@@ -5,63 +5,81 @@ Tests HTTP config update and data sending functionality
 """
 
 import asyncio
-import json
-from bleak import BleakClient, BleakScanner
+import os
+import sys
+
+# Add parent directory to path for shared module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ble_common import BLEClient, encode_command, find_gateway
+
+# Optional: uvloop is a faster event loop (Linux/macOS only)
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Config sections shared by the server_config updates below. The dicts are
+# only serialized, never mutated, so every command references the same object.
+_COMM = {
+    "mode": "WIFI",
+    "connection_mode": "Automatic",
+    "ip_address": "192.168.1.100",
+    "mac_address": "00:1A:2B:3C:4D:5E",
+    "wifi": {"ssid": "TestNetwork", "password": "TestPassword123"},
+}
+
+_MQTT_OFF = {
+    "enabled": False,
+    "broker_address": "mqtt.test.com",
+    "broker_port": 1883,
+    "client_id": "test_client",
+    "username": "",
+    "password": "",
+    "topic_publish": "test/data",
+    "topic_subscribe": "test/control",
+    "keep_alive": 60,
+    "clean_session": True,
+    "use_tls": False,
+}
+
+_MQTT_OFF_WITH_AUTH = {**_MQTT_OFF, "username": "test_user", "password": "test_pass"}
+
+
+class HTTPConfigTester(BLEClient):
+    async def connect(self):
+        # Skips the scan when the gateway from the last run answers directly
+        if await self.connect_cached():
+            print(f"Connected to known device ({self.client.address})")
+            return True
 
+        print("Scanning for SURIOTA gateway...")
+        # Stops at the first gateway advertisement instead of a full scan
+        device = await find_gateway(timeout=5.0)
 
-class HTTPConfigTester:
-    def __init__(self):
-        self.client = None
-        self.response_buffer = ""
+        if not device:
+            print("SURIOTA gateway not found")
+            return False
 
-    async def connect(self):
-        print("Scanning for SURIOTA CRUD Service...")
-        devices = await BleakScanner.discover()
-        device = next((d for d in devices if d.name and "SURIOTA" in d.name), None)
-
-        if device:
-            print(f"Found device: {device.name} ({device.address})")
-            self.client = BleakClient(device.address)
-            await self.client.connect()
-            await self.client.start_notify(
-                "11111111-1111-1111-1111-111111111102", self._notification_handler
-            )
-            print("Connected successfully!")
-            return True
-        else:
-            print("SURIOTA device not found")
+        try:
+            await self.connect_to(device.address)
+        except Exception as e:
+            await self.disconnect()
+            print(f"Connection failed: {e}")
             return False
+        print(f"Connected to {device.name} ({device.address})")
+        return True
 
-    def _notification_handler(self, sender, data):
-        fragment = data.decode("utf-8")
-        if fragment == "<END>":
-            try:
-                response = json.loads(self.response_buffer)
-                print(f"Response: {json.dumps(response, indent=2)}")
-            except json.JSONDecodeError:
-                print(f"Invalid JSON response: {self.response_buffer}")
-            self.response_buffer = ""
-        else:
-            self.response_buffer += fragment
-
-    async def send_command(self, command):
-        json_str = json.dumps(command, separators=(",", ":"))
-        print(f"Sending: {json_str}")
-
-        # Send with fragmentation
-        chunk_size = 18
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i : i + chunk_size]
-            await self.client.write_gatt_char(
-                "11111111-1111-1111-1111-111111111101", chunk.encode()
-            )
-            await asyncio.sleep(0.1)
-
-        # Send end marker
-        await self.client.write_gatt_char(
-            "11111111-1111-1111-1111-111111111101", "<END>".encode()
-        )
-        await asyncio.sleep(2)  # Wait for response
+    async def send_command(self, command, timeout=2.0):
+        payload = encode_command(command)  # Compact UTF-8 bytes
+        print(f"Sending: {payload.decode('utf-8')}")
+        await self.write_payload(payload)
+
+        # Wait for the parser to see <END>
+        if not await self.wait_response(timeout):
+            print(f"No response within {timeout}s")
 
 
 async def test_http_configuration():
@@ -83,30 +101,12 @@ async def test_http_configuration():
             "op": "update",
             "type": "server_config",
             "config": {
-                "communication": {
-                    "mode": "WIFI",
-                    "connection_mode": "Automatic",
-                    "ip_address": "192.168.1.100",
-                    "mac_address": "00:1A:2B:3C:4D:5E",
-                    "wifi": {"ssid": "TestNetwork", "password": "TestPassword123"},
-                },
+                "communication": _COMM,
                 "protocol": "http",
                 "data_interval": {"value": 2000, "unit": "ms"},
-                "mqtt_config": {
-                    "enabled": false,
-                    "broker_address": "mqtt.test.com",
-                    "broker_port": 1883,
-                    "client_id": "test_client",
-                    "username": "test_user",
-                    "password": "test_pass",
-                    "topic_publish": "test/data",
-                    "topic_subscribe": "test/control",
-                    "keep_alive": 60,
-                    "clean_session": true,
-                    "use_tls": false,
-                },
+                "mqtt_config": _MQTT_OFF_WITH_AUTH,
                 "http_config": {
-                    "enabled": true,
+                    "enabled": True,
                     "endpoint_url": "https://httpbin.org/post",
                     "method": "POST",
                     "headers": {
@@ -134,17 +134,11 @@ async def test_http_configuration():
             "op": "update",
             "type": "server_config",
             "config": {
-                "communication": {
-                    "mode": "WIFI",
-                    "connection_mode": "Automatic",
-                    "ip_address": "192.168.1.100",
-                    "mac_address": "00:1A:2B:3C:4D:5E",
-                    "wifi": {"ssid": "TestNetwork", "password": "TestPassword123"},
-                },
+                "communication": _COMM,
                 "protocol": "mqtt",
                 "data_interval": {"value": 1000, "unit": "ms"},
                 "mqtt_config": {
-                    "enabled": true,
+                    "enabled": True,
                     "broker_address": "broker.hivemq.com",
                     "broker_port": 1883,
                     "client_id": "esp32_test_client",
@@ -153,11 +147,11 @@ async def test_http_configuration():
                     "topic_publish": "test/esp32/data",
                     "topic_subscribe": "test/esp32/control",
                     "keep_alive": 60,
-                    "clean_session": true,
-                    "use_tls": false,
+                    "clean_session": True,
+                    "use_tls": False,
                 },
                 "http_config": {
-                    "enabled": false,
+                    "enabled": False,
                     "endpoint_url": "https://httpbin.org/post",
                     "method": "POST",
                     "headers": {
@@ -179,30 +173,12 @@ async def test_http_configuration():
             "op": "update",
             "type": "server_config",
             "config": {
-                "communication": {
-                    "mode": "WIFI",
-                    "connection_mode": "Automatic",
-                    "ip_address": "192.168.1.100",
-                    "mac_address": "00:1A:2B:3C:4D:5E",
-                    "wifi": {"ssid": "TestNetwork", "password": "TestPassword123"},
-                },
+                "communication": _COMM,
                 "protocol": "http",
                 "data_interval": {"value": 3000, "unit": "ms"},
-                "mqtt_config": {
-                    "enabled": false,
-                    "broker_address": "mqtt.test.com",
-                    "broker_port": 1883,
-                    "client_id": "test_client",
-                    "username": "",
-                    "password": "",
-                    "topic_publish": "test/data",
-                    "topic_subscribe": "test/control",
-                    "keep_alive": 60,
-                    "clean_session": true,
-                    "use_tls": false,
-                },
+                "mqtt_config": _MQTT_OFF,
                 "http_config": {
-                    "enabled": true,
+                    "enabled": True,
                     "endpoint_url": "https://httpbin.org/put",
                     "method": "PUT",
                     "headers": {
@@ -222,9 +198,10 @@ async def test_http_configuration():
     print("\n=== HTTP Configuration Tests Completed ===")
     print("Note: Device will restart after configuration updates to apply changes.")
 
-    if tester.client:
-        await tester.client.disconnect()
+    await tester.disconnect()
 
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(test_http_configuration())
@@ -5,94 +5,140 @@ Creates 1 RTU device with 10 data points via BLE
 
 import asyncio
 import json
-from bleak import BleakClient, BleakScanner
-
-# BLE Configuration
-SERVICE_UUID = "00001830-0000-1000-8000-00805f9b34fb"
-COMMAND_CHAR_UUID = "11111111-1111-1111-1111-111111111101"
-RESPONSE_CHAR_UUID = "11111111-1111-1111-1111-111111111102"
-SERVICE_NAME = "SURIOTA GW"
-
-
-class CreateDeviceRegisterClient:
+import os
+import sys
+from collections import namedtuple
+
+# Add parent directory to path for shared module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ble_common import BLEClient, encode_command, find_gateway
+
+# Optional: uvloop is a faster event loop (Linux/macOS only)
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# A register create includes a flash write that can outlast send_command's
+# timeout. The gateway drops fragments while it is busy, so a late response
+# is awaited this much longer before the next register is sent.
+LATE_RESPONSE_TIMEOUT = 10.0
+
+# Data type variants to create, as (base_type, endianness)
+TEST_DATA_TYPES = (
+    # 16-bit types
+    ("int16", ""),
+    ("uint16", ""),
+    ("bool", ""),
+    # 32-bit types
+    ("int32", "be"),
+    ("int32", "le"),
+    ("int32", "ws1"),
+    ("int32", "ws2"),
+    ("uint32", "be"),
+    ("uint32", "le"),
+    ("uint32", "ws1"),
+    ("uint32", "ws2"),
+    ("float32", "be"),
+    ("float32", "le"),
+    ("float32", "ws1"),
+    ("float32", "ws2"),
+    # 64-bit types
+    ("int64", "be"),
+    ("int64", "le"),
+    ("int64", "ws1"),
+    ("int64", "ws2"),
+    ("uint64", "be"),
+    ("uint64", "le"),
+    ("uint64", "ws1"),
+    ("uint64", "ws2"),
+    ("float64", "be"),
+    ("float64", "le"),
+    ("float64", "ws1"),
+    ("float64", "ws2"),
+)
+
+# (function_code, register type) per base type; anything else is a Holding Register
+_REGISTER_KIND = {
+    "bool": (1, "Coil"),
+    "discrete_input": (2, "Discrete Input"),
+    "input_register": (4, "Input Register"),
+}
+_HOLDING_REGISTER = (3, "Holding Register")
+
+# Everything about a test register except its address
+RegisterTemplate = namedtuple(
+    "RegisterTemplate", "data_type name_prefix function_code register_type description"
+)
+
+
+def _register_template(base_type, endianness):
+    data_type = f"{base_type}-{endianness}" if endianness else base_type
+    function_code, register_type = _REGISTER_KIND.get(base_type, _HOLDING_REGISTER)
+    return RegisterTemplate(
+        data_type,
+        data_type.upper().replace("-", "_") + "_TEST",
+        function_code,
+        register_type,
+        f"Test register for {data_type}",
+    )
+
+
+# Built once at import; the creation loop only adds the address
+REGISTER_TEMPLATES = tuple(_register_template(b, e) for b, e in TEST_DATA_TYPES)
+
+
+class CreateDeviceRegisterClient(BLEClient):
     def __init__(self):
-        self.client = None
-        self.response_buffer = ""
-        self.connected = False
+        super().__init__()
         self.device_id = None
 
     async def connect(self):
-        """Connect to BLE service"""
-        try:
-            devices = await BleakScanner.discover()
-            device = next((d for d in devices if d.name == SERVICE_NAME), None)
-
-            if not device:
-                print(f"Service {SERVICE_NAME} not found")
-                return False
+        # Skips the scan when the gateway from the last run answers directly
+        if await self.connect_cached():
+            print(f"Connected to known device ({self.client.address})")
+            return True
 
-            self.client = BleakClient(device.address)
-            await self.client.connect()
-            await self.client.start_notify(
-                RESPONSE_CHAR_UUID, self._notification_handler
-            )
+        print("Scanning for SURIOTA gateway...")
+        # Stops at the first gateway advertisement instead of a full scan
+        device = await find_gateway(timeout=5.0)
 
-            self.connected = True
-            print(f"Connected to {device.name}")
-            return True
+        if not device:
+            print("SURIOTA gateway not found")
+            return False
 
+        try:
+            await self.connect_to(device.address)
         except Exception as e:
+            await self.disconnect()
             print(f"Connection failed: {e}")
             return False
+        print(f"Connected to {device.name} ({device.address})")
+        return True
 
-    async def disconnect(self):
-        """Disconnect from BLE service"""
-        if self.client and self.connected:
-            await self.client.disconnect()
-            self.connected = False
-            print("Disconnected")
-
-    def _notification_handler(self, sender, data):
-        """Handle incoming response fragments"""
-        fragment = data.decode("utf-8")
-
-        if fragment == "<END>":
-            try:
-                response = json.loads(self.response_buffer)
-                status = response.get("status")
-                if status == "ok":
-                    print(f"✅ Response OK: {json.dumps(response, indent=2)}")
-                    # Store device ID for register creation
-                    if "device_id" in response:
-                        self.device_id = response["device_id"]
-                        print(f"   Stored device ID: {self.device_id}")
-                else:
-                    print(f"❌ Response ERROR: {json.dumps(response, indent=2)}")
-
-            except json.JSONDecodeError:
-                print(f"❌ Invalid JSON response: {self.response_buffer}")
-            finally:
-                self.response_buffer = ""
-        else:
-            self.response_buffer += fragment
-
-    async def send_command(self, command):
-        """Send command with automatic fragmentation"""
-        if not self.connected:
-            raise RuntimeError("Not connected to BLE service")
-
-        json_str = json.dumps(command, separators=(",", ":"))
-
-        # Send with fragmentation
-        chunk_size = 18
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i : i + chunk_size]
-            await self.client.write_gatt_char(COMMAND_CHAR_UUID, chunk.encode())
-            await asyncio.sleep(0.1)
+    async def send_command(self, command, timeout=2.0):
+        """Send a command; True once the response has arrived"""
+        await self.write_payload(encode_command(command))
 
-        # Send end marker
-        await self.client.write_gatt_char(COMMAND_CHAR_UUID, "<END>".encode())
-        await asyncio.sleep(2.0)
+        # Wait for the parser to see <END>
+        if not await self.wait_response(timeout):
+            print(f"No response within {timeout}s")
+            return False
+        return True
+
+    def handle_response(self, response, raw):
+        """Report status and keep the device ID for register creation"""
+        if response.get("status") == "ok":
+            print(f"✅ Response OK: {json.dumps(response, indent=2)}")
+            # Store device ID for register creation
+            if "device_id" in response:
+                self.device_id = response["device_id"]
+                print(f"   Stored device ID: {self.device_id}")
+        else:
+            print(f"❌ Response ERROR: {json.dumps(response, indent=2)}")
 
     async def create_rtu_device(self):
         """Create Modbus RTU device"""
@@ -123,88 +169,45 @@ class CreateDeviceRegisterClient:
             print("No device ID available")
             return
 
-        test_data_types = [
-            # 16-bit types
-            {"base_type": "int16", "endianness": ""},
-            {"base_type": "uint16", "endianness": ""},
-            {"base_type": "bool", "endianness": ""},
-            # 32-bit types
-            {"base_type": "int32", "endianness": "be"},
-            {"base_type": "int32", "endianness": "le"},
-            {"base_type": "int32", "endianness": "ws1"},
-            {"base_type": "int32", "endianness": "ws2"},
-            {"base_type": "uint32", "endianness": "be"},
-            {"base_type": "uint32", "endianness": "le"},
-            {"base_type": "uint32", "endianness": "ws1"},
-            {"base_type": "uint32", "endianness": "ws2"},
-            {"base_type": "float32", "endianness": "be"},
-            {"base_type": "float32", "endianness": "le"},
-            {"base_type": "float32", "endianness": "ws1"},
-            {"base_type": "float32", "endianness": "ws2"},
-            # 64-bit types
-            {"base_type": "int64", "endianness": "be"},
-            {"base_type": "int64", "endianness": "le"},
-            {"base_type": "int64", "endianness": "ws1"},
-            {"base_type": "int64", "endianness": "ws2"},
-            {"base_type": "uint64", "endianness": "be"},
-            {"base_type": "uint64", "endianness": "le"},
-            {"base_type": "uint64", "endianness": "ws1"},
-            {"base_type": "uint64", "endianness": "ws2"},
-            {"base_type": "float64", "endianness": "be"},
-            {"base_type": "float64", "endianness": "le"},
-            {"base_type": "float64", "endianness": "ws1"},
-            {"base_type": "float64", "endianness": "ws2"},
-        ]
-
-        address_counter = 1
-        for i, reg_spec in enumerate(test_data_types):
-            base_type = reg_spec["base_type"]
-            endianness = reg_spec["endianness"]
-
-            data_type_str = base_type
-            if endianness:
-                data_type_str += f"-{endianness}"
-
-            register_name = (
-                f"{data_type_str.upper().replace('-', '_')}_TEST_{address_counter}"
-            )
+        # One command object for every register; only the config fields change.
+        # send_command serializes it before returning, so reuse is safe.
+        command = {
+            "op": "create",
+            "type": "register",
+            "device_id": self.device_id,
+            "config": {
+                "address": None,
+                "register_name": None,
+                "type": None,
+                "function_code": None,
+                "data_type": None,
+                "description": None,
+                "refresh_rate_ms": 5000,
+            },
+        }
+        config = command["config"]
+
+        total = len(REGISTER_TEMPLATES)
+        for address_counter, tpl in enumerate(REGISTER_TEMPLATES, 1):
+            register_name = f"{tpl.name_prefix}_{address_counter}"
 
             print(
-                f"\n=== Creating Register {i+1}/{len(test_data_types)}: {register_name} ({data_type_str}) ==="
+                f"\n=== Creating Register {address_counter}/{total}: {register_name} ({tpl.data_type}) ==="
             )
 
-            # Determine function code and register type
-            function_code = 3  # Default to Holding Register
-            register_type = "Holding Register"
-            if base_type == "bool":
-                function_code = 1
-                register_type = "Coil"
-            elif base_type == "discrete_input":  # Example for other types if needed
-                function_code = 2
-                register_type = "Discrete Input"
-            elif base_type == "input_register":  # Example for other types if needed
-                function_code = 4
-                register_type = "Input Register"
-
-            await self.send_command(
-                {
-                    "op": "create",
-                    "type": "register",
-                    "device_id": self.device_id,
-                    "config": {
-                        "address": address_counter,
-                        "register_name": register_name,
-                        "type": register_type,
-                        "function_code": function_code,
-                        "data_type": data_type_str,
-                        "description": f"Test register for {data_type_str}",
-                        "refresh_rate_ms": 5000,
-                    },
-                }
-            )
+            config["address"] = address_counter
+            config["register_name"] = register_name
+            config["type"] = tpl.register_type
+            config["function_code"] = tpl.function_code
+            config["data_type"] = tpl.data_type
+            config["description"] = tpl.description
+            responded = await self.send_command(command)
             print(f"   Sending command to create register: {register_name}")
-            address_counter += 1
-            await asyncio.sleep(1)  # Increased delay to 1 second
+            if not responded:
+                # Still busy with this create: wait for its <END> so the
+                # next command's fragments are not dropped
+                if not await self.wait_response(LATE_RESPONSE_TIMEOUT):
+                    print(f"   Still no response after {LATE_RESPONSE_TIMEOUT}s")
 
     async def read_device_registers(self):
         """Read all registers for the created device"""
@@ -214,9 +217,9 @@ class CreateDeviceRegisterClient:
 
         print(f"\n=== Reading all registers for device {self.device_id} ===")
         await self.send_command(
-            {"op": "read", "type": "registers", "device_id": self.device_id}
+            {"op": "read", "type": "registers", "device_id": self.device_id},
+            timeout=4.0,  # Register listing is the largest response
         )
-        await asyncio.sleep(2)  # Wait for response
 
 
 async def main():
@@ -252,4 +255,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
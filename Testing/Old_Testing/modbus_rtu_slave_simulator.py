@@ -1,8 +1,11 @@
 import minimalmodbus
 import serial
+import array
+import logging
 import struct
+import sys
 import math
-import time
+from functools import lru_cache
 
 # --- Configuration ---
 SLAVE_ADDRESS = 1
@@ -13,6 +16,32 @@ BAUD_RATE = 9600
 PARITY = serial.PARITY_NONE
 DATA_BITS = 8
 STOP_BITS = 1
+REGISTER_SPACE = 0x10000  # Full 16-bit Modbus address range
+# Function codes whose requests are always 8 bytes (ID, FC, 4 data, CRC)
+FIXED_LENGTH_FUNCTIONS = frozenset((1, 2, 3, 4, 5, 6))
+
+# --- Logging ---
+# Per-request frame dumps are logged at DEBUG, so a default run skips the
+# hex formatting entirely; pass -v to see every request and response
+logging.basicConfig(
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    level=logging.DEBUG if "-v" in sys.argv[1:] else logging.INFO,
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+log = logging.getLogger(__name__)
+
+
+class _Hex:
+    """Formats bytes as hex only if the log record is actually emitted."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return self.data.hex()
+
 
 # --- Test Values for each data type ---
 # These values will be converted to raw Modbus registers by the simulator
@@ -48,105 +77,154 @@ TEST_VALUES = {
 
 # --- Helper functions for Python-side data conversion to Modbus registers ---
 
+# (struct byte order, word order) per endianness suffix; anything else is "be"
+_END_MAP = {
+    "be": (">", "be"),
+    "le": ("<", "le"),
+    # Word swaps keep the bytes within each word big-endian
+    "ws1": (">", "ws1"),  # R2 R1 for 32-bit, R2 R1 R4 R3 for 64-bit
+    "ws2": (">", "ws2"),  # R1 R2 for 32-bit, R3 R4 R1 R2 for 64-bit
+}
 
-def _float_to_bytes(value, num_bytes, byteorder_char):
-    """Convert float to bytes."""
-    if num_bytes == 4:
-        return struct.pack(f"{byteorder_char}f", value)
-    elif num_bytes == 8:
-        return struct.pack(f"{byteorder_char}d", value)
-    else:
-        raise ValueError("Unsupported float byte length")
 
+def _to_u16(value):
+    return value & 0xFFFF
 
-def _int_to_bytes(value, num_bytes, byteorder_str, signed):
-    """Convert int to bytes."""
-    return value.to_bytes(num_bytes, byteorder=byteorder_str, signed=signed)
 
+def _to_bool(value):
+    return 1 if value else 0
 
-def _bytes_to_uint16_registers(byte_data, word_order):
-    """Convert bytes to a list of uint16 Modbus registers based on word order."""
-    registers = []
-    for i in range(0, len(byte_data), 2):
-        registers.append(
-            int.from_bytes(byte_data[i : i + 2], byteorder="big")
-        )  # Modbus registers are big-endian
-
-    if (
-        word_order == "le"
-    ):  # Little-endian word order (R2 R1 for 32-bit, R4 R3 R2 R1 for 64-bit)
-        registers.reverse()
-    elif word_order == "ws1":  # Word Swap 1 (R2 R1 for 32-bit, R2 R1 R4 R3 for 64-bit)
-        if len(registers) == 2:  # 32-bit
-            registers = [registers[1], registers[0]]
-        elif len(registers) == 4:  # 64-bit
-            registers = [registers[1], registers[0], registers[3], registers[2]]
-    elif word_order == "ws2":  # Word Swap 2 (R3 R4 R1 R2 for 64-bit)
-        if len(registers) == 4:  # 64-bit
-            registers = [registers[2], registers[3], registers[0], registers[1]]
-
-    return registers
 
+# Single-register types map straight to the register value
+_SINGLE_REGISTER = {
+    "int16": _to_u16,
+    "uint16": _to_u16,
+    "bool": _to_bool,
+}
 
-def convert_value_to_modbus_registers(data_type_str, value):
-    """Converts a Python value to a list of raw uint16 Modbus registers."""
-    base_type = data_type_str
-    endianness = "be"  # Default
-
-    dash_index = data_type_str.find("-")
-    if dash_index != -1:
-        base_type = data_type_str[:dash_index]
-        endianness = data_type_str[dash_index + 1 :]
-
-    byteorder_str = "big"  # For int.to_bytes
-    byteorder_char = ">"  # For struct.pack
-    word_order = "be"  # For _bytes_to_uint16_registers
-
-    # Map endianness string to native byteorder and word_order
-    if endianness == "be":
-        byteorder_str = "big"
-        byteorder_char = ">"
-        word_order = "be"
-    elif endianness == "le":
-        byteorder_str = "little"
-        byteorder_char = "<"
-        word_order = "le"
-    elif endianness == "ws1":  # Word Swap 1 (R2 R1 for 32-bit, R2 R1 R4 R3 for 64-bit)
-        byteorder_str = "big"  # Bytes within words are still big-endian
-        byteorder_char = ">"
-        word_order = "ws1"
-    elif endianness == "ws2":  # Word Swap 2 (R1 R2 for 32-bit, R3 R4 R1 R2 for 64-bit)
-        byteorder_str = "big"  # Bytes within words are still big-endian
-        byteorder_char = ">"
-        word_order = "ws2"
-
-    if base_type == "int16":
-        return [value & 0xFFFF]
-    elif base_type == "uint16":
-        return [value & 0xFFFF]
-    elif base_type == "bool":
-        return [1 if value else 0]
-    elif base_type == "int32":
-        byte_data = _int_to_bytes(value, 4, byteorder_str, signed=True)
-        return _bytes_to_uint16_registers(byte_data, word_order)
-    elif base_type == "uint32":
-        byte_data = _int_to_bytes(value, 4, byteorder_str, signed=False)
-        return _bytes_to_uint16_registers(byte_data, word_order)
-    elif base_type == "float32":
-        byte_data = _float_to_bytes(value, 4, byteorder_char)
-        return _bytes_to_uint16_registers(byte_data, word_order)
-    elif base_type == "int64":
-        byte_data = _int_to_bytes(value, 8, byteorder_str, signed=True)
-        return _bytes_to_uint16_registers(byte_data, word_order)
-    elif base_type == "uint64":
-        byte_data = _int_to_bytes(value, 8, byteorder_str, signed=False)
-        return _bytes_to_uint16_registers(byte_data, word_order)
-    elif base_type == "float64":
-        byte_data = _float_to_bytes(value, 8, byteorder_char)
-        return _bytes_to_uint16_registers(byte_data, word_order)
+# struct format codes for the multi-register types
+_STRUCT_CODES = {
+    "int32": "i",
+    "uint32": "I",
+    "float32": "f",
+    "int64": "q",
+    "uint64": "Q",
+    "float64": "d",
+}
+
+# CRC is sent little-endian
+_PACK_U16_LE = struct.Struct("<H").pack
+
+# Big-endian uint16 word unpackers, keyed by byte length
+_UNPACK_U16 = {
+    4: struct.Struct(">HH").unpack,
+    8: struct.Struct(">HHHH").unpack,
+}
+
+# Register order for each (register count, word order); index into the BE words
+# le:  R2 R1 for 32-bit, R4 R3 R2 R1 for 64-bit
+# ws1: R2 R1 for 32-bit, R2 R1 R4 R3 for 64-bit
+# ws2: R1 R2 for 32-bit, R3 R4 R1 R2 for 64-bit
+_WORD_PERMS = {
+    (2, "be"): (0, 1),
+    (2, "le"): (1, 0),
+    (2, "ws1"): (1, 0),
+    (2, "ws2"): (0, 1),
+    (4, "be"): (0, 1, 2, 3),
+    (4, "le"): (3, 2, 1, 0),
+    (4, "ws1"): (1, 0, 3, 2),
+    (4, "ws2"): (2, 3, 0, 1),
+}
+
+# (pack, word_order) per data type string, resolved on first use.
+# word_order None means pack() already returns the single register value.
+_DISPATCH = {}
+
+
+def _bytes_to_uint16_registers(byte_data, word_order):
+    """Convert bytes to a tuple of uint16 Modbus registers based on word order."""
+    # Modbus registers are big-endian; decode all words in one call
+    registers = _UNPACK_U16[len(byte_data)](byte_data)
+    perm = _WORD_PERMS[(len(registers), word_order)]
+    return tuple(registers[i] for i in perm)
+
+
+def _build_dispatch(data_type_str):
+    """Resolve a data type string to its (pack, word_order) entry."""
+    base_type, _, endianness = data_type_str.partition("-")
+    byteorder_char, word_order = _END_MAP.get(endianness, _END_MAP["be"])
+
+    if base_type in _SINGLE_REGISTER:
+        return _SINGLE_REGISTER[base_type], None
+    elif base_type in _STRUCT_CODES:
+        code = _STRUCT_CODES[base_type]
+        return struct.Struct(byteorder_char + code).pack, word_order
     else:
         print(f"Warning: Unknown data type {data_type_str}. Defaulting to uint16.")
-        return [value & 0xFFFF]  # Fallback
+        return _to_u16, None  # Fallback
+
+
+@lru_cache(maxsize=None, typed=True)
+def convert_value_to_modbus_registers(data_type_str, value):
+    """Converts a Python value to a tuple of raw uint16 Modbus registers.
+
+    Memoized; the result is shared between callers, hence immutable.
+    """
+    entry = _DISPATCH.get(data_type_str)
+    if entry is None:
+        entry = _DISPATCH[data_type_str] = _build_dispatch(data_type_str)
+
+    pack, word_order = entry
+    if word_order is None:
+        return (pack(value),)
+    return _bytes_to_uint16_registers(pack(value), word_order)
+
+
+def _build_layout():
+    """Assign consecutive addresses from 1 to the TEST_VALUES entries.
+
+    Returns (address, data_type_str, value, registers, is_coil) tuples.
+    """
+    layout = []
+    address = 1
+    for data_type_str, value in TEST_VALUES.items():
+        is_coil = "bool" in data_type_str
+        if is_coil:
+            registers = [1 if value else 0]
+        else:
+            registers = list(convert_value_to_modbus_registers(data_type_str, value))
+        layout.append((address, data_type_str, value, registers, is_coil))
+        address += len(registers)
+    return tuple(layout)
+
+
+# TEST_VALUES is fixed, so the register map is computed once at import
+_LAYOUT = _build_layout()
+
+
+# --- CRC-16/Modbus (poly 0xA001 reflected, init 0xFFFF) ---
+
+
+def _make_crc_table():
+    table = array.array("H")
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC_TABLE = _make_crc_table()
+
+
+def crc16(data):
+    """CRC-16/Modbus of data, one table lookup per byte."""
+    table = _CRC_TABLE
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
 
 
 class ModbusSlaveSimulator:
@@ -159,8 +237,14 @@ class ModbusSlaveSimulator:
         self.instrument.serial.timeout = 0.05  # Shorter timeout for slave
         self.instrument.mode = minimalmodbus.MODE_RTU
 
-        self.holding_registers = {}
+        # Dense holding register storage, kept in big-endian wire byte order
+        # so a read is one slice; reg_valid marks populated addresses
+        self.reg_array = array.array("H", bytes(2 * REGISTER_SPACE))
+        self.reg_valid = bytearray(REGISTER_SPACE)
         self.coils = {}
+        # FC3 responses by (start_address, quantity); cleared whenever
+        # registers are written
+        self._fc3_cache = {}
 
         print(
             f"Modbus RTU Slave Simulator initialized on {port} (Slave ID: {slave_address})"
@@ -171,43 +255,30 @@ class ModbusSlaveSimulator:
 
     def _setup_registers(self):
         """Populate holding registers and coils with test values."""
-        address_counter = 1
-        for data_type_str, value in TEST_VALUES.items():
-            if "bool" in data_type_str:
-                self.coils[address_counter] = 1 if value else 0
+        self._fc3_cache.clear()
+        for address_counter, data_type_str, value, registers, is_coil in _LAYOUT:
+            if is_coil:
+                self.coils[address_counter] = registers[0]
                 print(f"Coil {address_counter} ({data_type_str}): {value}")
             else:
-                registers = convert_value_to_modbus_registers(data_type_str, value)
-                for i, reg_value in enumerate(registers):
-                    self.holding_registers[address_counter + i] = reg_value
+                end_address = address_counter + len(registers)
+                words = array.array("H", registers)
+                if sys.byteorder == "little":
+                    words.byteswap()  # Host order -> Modbus big-endian
+                self.reg_array[address_counter:end_address] = words
+                self.reg_valid[address_counter:end_address] = b"\x01" * len(registers)
                 print(
                     f"Holding Registers {address_counter}-{address_counter + len(registers) - 1} ({data_type_str}): {value} -> Raw: {registers}"
                 )
 
-            # Increment address counter by the number of registers used for this data type
-            if (
-                "int16" in data_type_str
-                or "uint16" in data_type_str
-                or "bool" in data_type_str
-            ):
-                address_counter += 1
-            elif (
-                "int32" in data_type_str
-                or "uint32" in data_type_str
-                or "float32" in data_type_str
-            ):
-                address_counter += 2
-            elif (
-                "int64" in data_type_str
-                or "uint64" in data_type_str
-                or "float64" in data_type_str
-            ):
-                address_counter += 4
-
         print("\n--- Initialized Modbus Registers ---")
-        print(
-            "Holding Registers:", {k: hex(v) for k, v in self.holding_registers.items()}
-        )
+        holding = {
+            address + i: hex(reg_value)
+            for address, _, _, registers, is_coil in _LAYOUT
+            if not is_coil
+            for i, reg_value in enumerate(registers)
+        }
+        print("Holding Registers:", holding)
         print("Coils:", self.coils)
 
     def _handle_request(self, request_pdu):
@@ -215,27 +286,30 @@ class ModbusSlaveSimulator:
         function_code = request_pdu[0]
 
         if function_code == 3:  # Read Holding Registers
-            start_address = int.from_bytes(request_pdu[1:3], byteorder="big")
-            quantity = int.from_bytes(request_pdu[3:5], byteorder="big")
-
-            response_bytes = [function_code, quantity * 2]  # Function code, byte count
-
-            for i in range(quantity):
-                address = start_address + i
-                if address in self.holding_registers:
-                    value = self.holding_registers[address]
-                    response_bytes.extend(
-                        value.to_bytes(2, byteorder="big")
-                    )  # Modbus registers are big-endian
-                else:
-                    # Respond with exception if address is invalid
-                    return bytes([0x83, 0x02])  # Illegal Data Address
-
-            return bytes(response_bytes)
+            # Big-endian 2-byte fields, decoded without slicing
+            start_address = (request_pdu[1] << 8) | request_pdu[2]
+            quantity = (request_pdu[3] << 8) | request_pdu[4]
+
+            key = (start_address, quantity)
+            response = self._fc3_cache.get(key)
+            if response is not None:
+                return response
+
+            end_address = start_address + quantity
+            valid = self.reg_valid[start_address:end_address]
+            if len(valid) != quantity or 0 in valid:
+                # Respond with exception if any address is invalid
+                return bytes([0x83, 0x02])  # Illegal Data Address
+
+            # Function code, byte count, then the registers as stored (big-endian)
+            body = self.reg_array[start_address:end_address].tobytes()
+            response = bytes((function_code, quantity * 2)) + body
+            self._fc3_cache[key] = response
+            return response
 
         elif function_code == 1:  # Read Coils
-            start_address = int.from_bytes(request_pdu[1:3], byteorder="big")
-            quantity = int.from_bytes(request_pdu[3:5], byteorder="big")
+            start_address = (request_pdu[1] << 8) | request_pdu[2]
+            quantity = (request_pdu[3] << 8) | request_pdu[4]
 
             # For simplicity, only handle quantity = 1 for now
             if quantity != 1:
@@ -256,6 +330,29 @@ class ModbusSlaveSimulator:
             # Respond with exception for unsupported function code
             return bytes([function_code | 0x80, 0x01])  # Illegal Function
 
+    def _read_frame(self, ser):
+        """Read one RTU request, sized from its function code.
+
+        A short read means the read timed out mid-frame; the caller drops it,
+        and the CRC check catches frames read out of step.
+        """
+        read = ser.read
+        header = read(2)  # Slave ID, function code
+        if len(header) < 2:
+            return header
+
+        function_code = header[1]
+        if function_code in FIXED_LENGTH_FUNCTIONS:
+            return header + read(6)  # Address, quantity/value, CRC
+        elif function_code in (15, 16):
+            head = read(5)  # Address, quantity, byte count
+            if len(head) < 5:
+                return header + head
+            return header + head + read(head[4] + 2)  # Data, CRC
+        else:
+            # Unknown layout: take what has arrived; the CRC check decides
+            return header + read(ser.in_waiting)
+
     def run(self):
         """Run the Modbus RTU slave simulator."""
         self._setup_registers()
@@ -273,12 +370,24 @@ class ModbusSlaveSimulator:
             parity=PARITY,
             bytesize=DATA_BITS,
             stopbits=STOP_BITS,
-            timeout=0.1,  # Short timeout for reading
+            # Frames are read by expected length, so a read returns as soon as
+            # the frame is complete. No inter-byte timeout: USB-RS485 adapters
+            # deliver bytes in latency-timer bursts (16 ms on FTDI), and
+            # POSIX ignores gaps under 0.1 s anyway. The timeout only bounds
+            # how long Ctrl+C can go unnoticed.
+            timeout=0.5,
         )
 
+        # Bind the per-request callables once, outside the receive loop
+        write = ser.write
+        handle_request = self._handle_request
+        pack_crc = _PACK_U16_LE
+        crc = crc16
+
         while True:
             try:
-                request = ser.read(256)  # Read up to 256 bytes
+                # Whole frame is read even if addressed to another slave
+                request = self._read_frame(ser)
                 if request:
                     # Basic Modbus RTU frame parsing (simplified)
                     # Slave ID (1 byte), Function Code (1 byte), Data (N bytes), CRC (2 bytes)
@@ -288,6 +397,12 @@ class ModbusSlaveSimulator:
                     ):  # Minimum request length (slave ID, func code, address, quantity, CRC)
                         continue
 
+                    # A bad CRC means the read started mid-frame: drop what is
+                    # buffered so the next read starts on a frame boundary
+                    if pack_crc(crc(request[:-2])) != request[-2:]:
+                        ser.reset_input_buffer()
+                        continue
+
                     slave_id = request[0]
                     if slave_id != SLAVE_ADDRESS:
                         continue  # Not for this slave
@@ -295,20 +410,18 @@ class ModbusSlaveSimulator:
                     # Extract PDU (Function Code + Data)
                     request_pdu = request[1:-2]  # Exclude slave ID and CRC
 
-                    print(f"Received request from master: {request.hex()}")
+                    log.debug("Received request from master: %s", _Hex(request))
 
-                    response_pdu = self._handle_request(request_pdu)
+                    response_pdu = handle_request(request_pdu)
 
                     if response_pdu:
                         # Build full RTU response frame (Slave ID + PDU + CRC)
                         response_frame = bytes([SLAVE_ADDRESS]) + response_pdu
-                        crc = minimalmodbus._calculateCrcString(response_frame)
-                        response_frame += crc.to_bytes(
-                            2, byteorder="little"
-                        )  # CRC is little-endian
+                        # CRC is little-endian
+                        response_frame += pack_crc(crc(response_frame))
 
-                        ser.write(response_frame)
-                        print(f"Sent response: {response_frame.hex()}")
+                        write(response_frame)
+                        log.debug("Sent response: %s", _Hex(response_frame))
 
             except serial.SerialException as e:
                 print(f"Serial error: {e}")
@@ -316,14 +429,12 @@ class ModbusSlaveSimulator:
             except Exception as e:
                 print(f"An unexpected error occurred: {e}")
 
-            time.sleep(0.01)  # Small delay to prevent busy-waiting
-
 
 if __name__ == "__main__":
     print("--- Modbus RTU Slave Simulator ---")
     print("Ensure your ESP32 is connected to a virtual serial port pair.")
     print(f"This simulator will listen on {SERIAL_PORT}.")
-    print("Press Ctrl+C to stop.")
+    print("Press Ctrl+C to stop. Run with -v to log every frame.")
 
     try:
         simulator = ModbusSlaveSimulator(SERIAL_PORT, SLAVE_ADDRESS)
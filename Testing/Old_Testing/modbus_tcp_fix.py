@@ -10,11 +10,32 @@ import json
 from bleak import BleakClient, BleakScanner
 import sys
 
+# Optional: orjson serializes straight to compact UTF-8 bytes
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _dumps = orjson.dumps
+else:
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+# BLE Configuration
+COMMAND_CHAR_UUID = "11111111-1111-1111-1111-111111111101"
+RESPONSE_CHAR_UUID = "11111111-1111-1111-1111-111111111102"
+CHUNK_SIZE = 18  # Bytes per write, as per update_test.py
+
 
 class ModbusTCPFixer:
     def __init__(self):
         self.client = None
-        self.response_buffer = ""
+        self.response_buffer = bytearray()  # Decoded once at <END>
         self.last_response = None
 
     async def connect(self):
@@ -31,7 +52,7 @@ class ModbusTCPFixer:
 
                 # Start listening for responses
                 await self.client.start_notify(
-                    "11111111-1111-1111-1111-111111111102", self._notification_handler
+                    RESPONSE_CHAR_UUID, self._notification_handler
                 )
                 print("✓ Connected successfully!")
                 return True
@@ -46,40 +67,38 @@ class ModbusTCPFixer:
 
     def _notification_handler(self, sender, data):
         """Handle BLE notifications"""
-        fragment = data.decode("utf-8")
-        if fragment == "<END>":
+        if data == b"<END>":
             try:
+                # json.loads accepts the UTF-8 bytes directly
                 self.last_response = json.loads(self.response_buffer)
                 print(f"  📥 Response: {json.dumps(self.last_response, indent=4)}")
-            except json.JSONDecodeError:
-                print(f"  ❌ Invalid JSON response: {self.response_buffer}")
-            self.response_buffer = ""
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                text = self.response_buffer.decode("utf-8", errors="replace")
+                print(f"  ❌ Invalid JSON response: {text}")
+            self.response_buffer.clear()
         else:
-            self.response_buffer += fragment
+            self.response_buffer.extend(data)
 
     async def send_command(self, command, label="", wait_time=2.0):
         """Send BLE CRUD command"""
-        json_str = json.dumps(command, separators=(",", ":"))
+        data = _dumps(command)
 
         if label:
             print(f"\n  {label}")
 
-        print(f"  📤 Sending: {json_str[:100]}{'...' if len(json_str) > 100 else ''}")
+        preview = data[:100].decode("utf-8", errors="ignore")
+        print(f"  📤 Sending: {preview}{'...' if len(data) > 100 else ''}")
 
         try:
-            # Send with fragmentation (18 bytes per chunk as per update_test.py)
-            chunk_size = 18
-            for i in range(0, len(json_str), chunk_size):
-                chunk = json_str[i : i + chunk_size]
+            # Slice the encoded bytes; each acknowledged write already
+            # paces the sender, so no sleep between chunks
+            for i in range(0, len(data), CHUNK_SIZE):
                 await self.client.write_gatt_char(
-                    "11111111-1111-1111-1111-111111111101", chunk.encode()
+                    COMMAND_CHAR_UUID, data[i : i + CHUNK_SIZE]
                 )
-                await asyncio.sleep(0.05)
 
             # Send end marker
-            await self.client.write_gatt_char(
-                "11111111-1111-1111-1111-111111111101", "<END>".encode()
-            )
+            await self.client.write_gatt_char(COMMAND_CHAR_UUID, b"<END>")
 
             # Wait for response
             await asyncio.sleep(wait_time)
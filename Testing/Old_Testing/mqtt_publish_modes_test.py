@@ -6,37 +6,387 @@ Tests interval units (ms/s/m) and multi-topic publishing
 
 import asyncio
 import json
+import logging
+import threading
+from collections import namedtuple
 from bleak import BleakClient, BleakScanner
 
+# Optional: orjson serializes straight to compact UTF-8 bytes and parses faster
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+
+    def _pretty(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+else:
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def _pretty(obj):
+        return json.dumps(obj, indent=2)
+
+    _loads = json.loads
+
+# Optional: uvloop is a faster event loop (Linux/macOS only)
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
 # BLE Configuration
 SERVICE_UUID = "00001830-0000-1000-8000-00805f9b34fb"
 COMMAND_CHAR_UUID = "11111111-1111-1111-1111-111111111101"
 RESPONSE_CHAR_UUID = "11111111-1111-1111-1111-111111111102"
 SERVICE_NAME = "SURIOTA GW"
+END_MARKER = b"<END>"  # Frame terminator, compared as raw bytes
+
+# Per-fragment traces are DEBUG; enable with logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+# A command serialized once: wire bytes plus the indented form that is printed
+Payload = namedtuple("Payload", "data pretty")
+
+
+def _payload(command):
+    return Payload(_dumps(command), _pretty(command))
+
+
+# =============================================================================
+# Test commands (static, serialized at import)
+# =============================================================================
+_READ_MQTT_CONFIG = _payload({"op": "read", "type": "server_config"})
+
+# Fields every MQTT update test sends unchanged. broker_port (1883),
+# clean_session (true) and use_tls (false) are left to the firmware, which
+# fills in those same defaults; keep_alive is fixed at 120s by MqttManager.
+_BASE_MQTT = {
+    "enabled": True,
+    "broker_address": "demo.thingsboard.io",
+    "username": "device_token",
+    "password": "device_password",
+}
+
+
+def _mqtt_update(overrides):
+    """server_config update with _BASE_MQTT plus the test's own fields
+
+    Default-mode tests omit customize_mode: the firmware recreates a missing
+    one as disabled with no topics. default_mode is always sent, since a
+    missing one comes back enabled.
+    """
+    return {
+        "op": "update",
+        "type": "server_config",
+        "config": {"mqtt_config": {**_BASE_MQTT, **overrides}},
+    }
+
+
+_DEFAULT_MODE_SECONDS = _payload(
+    _mqtt_update(
+        {
+            "client_id": "esp32_test_default",
+            "publish_mode": "default",
+            "default_mode": {
+                "enabled": True,
+                "topic_publish": "v1/devices/me/telemetry",
+                "topic_subscribe": "device/control",
+                "interval": 5,
+                "interval_unit": "s",
+            },
+        }
+    )
+)
+
+_DEFAULT_MODE_MILLISECONDS = _payload(
+    _mqtt_update(
+        {
+            "client_id": "esp32_test_default_ms",
+            "publish_mode": "default",
+            "default_mode": {
+                "enabled": True,
+                "topic_publish": "v1/devices/me/telemetry",
+                "topic_subscribe": "device/control",
+                "interval": 3000,
+                "interval_unit": "ms",
+            },
+        }
+    )
+)
+
+_DEFAULT_MODE_MINUTES = _payload(
+    _mqtt_update(
+        {
+            "client_id": "esp32_test_default_min",
+            "publish_mode": "default",
+            "default_mode": {
+                "enabled": True,
+                "topic_publish": "v1/devices/me/telemetry",
+                "topic_subscribe": "device/control",
+                "interval": 1,
+                "interval_unit": "m",
+            },
+        }
+    )
+)
+
+_CUSTOMIZE_MODE_BASIC = _payload(
+    _mqtt_update(
+        {
+            "client_id": "esp32_test_customize",
+            "publish_mode": "customize",
+            "default_mode": {"enabled": False},
+            "customize_mode": {
+                "enabled": True,
+                "custom_topics": [
+                    {
+                        "topic": "sensor/temperature",
+                        "registers": [1, 2, 3],
+                        "interval": 5,
+                        "interval_unit": "s",
+                    },
+                    {
+                        "topic": "sensor/pressure",
+                        "registers": [4, 5],
+                        "interval": 10,
+                        "interval_unit": "s",
+                    },
+                ],
+            },
+        }
+    )
+)
+
+_CUSTOMIZE_MODE_MIXED_INTERVALS = _payload(
+    _mqtt_update(
+        {
+            "client_id": "esp32_test_mixed",
+            "publish_mode": "customize",
+            "default_mode": {"enabled": False},
+            "customize_mode": {
+                "enabled": True,
+                "custom_topics": [
+                    {
+                        "topic": "alerts/critical",
+                        "registers": [1, 5],
+                        "interval": 500,
+                        "interval_unit": "ms",
+                    },
+                    {
+                        "topic": "dashboard/realtime",
+                        "registers": [1, 2, 3, 4, 5, 6],
+                        "interval": 2,
+                        "interval_unit": "s",
+                    },
+                    {
+                        "topic": "database/historical",
+                        "registers": [1, 2, 3, 4, 5, 6],
+                        "interval": 1,
+                        "interval_unit": "m",
+                    },
+                ],
+            },
+        }
+    )
+)
+
+_CUSTOMIZE_MODE_REGISTER_OVERLAP = _payload(
+    _mqtt_update(
+        {
+            "client_id": "esp32_test_overlap",
+            "publish_mode": "customize",
+            "default_mode": {"enabled": False},
+            "customize_mode": {
+                "enabled": True,
+                "custom_topics": [
+                    {
+                        "topic": "sensor/temperature",
+                        "registers": [1, 2, 3],
+                        "interval": 5,
+                        "interval_unit": "s",
+                    },
+                    {
+                        "topic": "sensor/all_sensors",
+                        "registers": [1, 2, 3, 4, 5],
+                        "interval": 10,
+                        "interval_unit": "s",
+                    },
+                    {
+                        "topic": "sensor/critical",
+                        "registers": [1],
+                        "interval": 2,
+                        "interval_unit": "s",
+                    },
+                ],
+            },
+        }
+    )
+)
+
+_WAREHOUSE_SCENARIO = _payload(
+    _mqtt_update(
+        {
+            "client_id": "warehouse_gateway",
+            "publish_mode": "customize",
+            "default_mode": {"enabled": False},
+            "customize_mode": {
+                "enabled": True,
+                "custom_topics": [
+                    {
+                        "topic": "warehouse/environment/temperature",
+                        "registers": [1, 2, 3, 4],
+                        "interval": 5,
+                        "interval_unit": "s",
+                    },
+                    {
+                        "topic": "warehouse/environment/humidity",
+                        "registers": [5, 6, 7, 8],
+                        "interval": 5,
+                        "interval_unit": "s",
+                    },
+                    {
+                        "topic": "warehouse/safety/smoke",
+                        "registers": [9, 10],
+                        "interval": 1,
+                        "interval_unit": "s",
+                    },
+                    {
+                        "topic": "warehouse/safety/co2",
+                        "registers": [11, 12],
+                        "interval": 2,
+                        "interval_unit": "s",
+                    },
+                ],
+            },
+        }
+    )
+)
+
+_DISABLE_BOTH_MODES = _payload(
+    _mqtt_update(
+        {
+            "client_id": "esp32_test_disabled",
+            "publish_mode": "default",
+            "default_mode": {"enabled": False},
+            "customize_mode": {"enabled": False},
+        }
+    )
+)
+
+# One entry per test: run_all_tests() order; the menu numbers TESTS[1:] as 1-8
+Test = namedtuple("Test", "name title notes payload")
+
+TESTS = [
+    Test(
+        "Read Current Config",
+        "📖 Reading Current MQTT Configuration",
+        (),
+        _READ_MQTT_CONFIG,
+    ),
+    Test(
+        "Default Mode - Seconds",
+        "🧪 TEST 1: Default Mode - 5 seconds interval",
+        (),
+        _DEFAULT_MODE_SECONDS,
+    ),
+    Test(
+        "Default Mode - Milliseconds",
+        "🧪 TEST 2: Default Mode - 3000 milliseconds interval",
+        (),
+        _DEFAULT_MODE_MILLISECONDS,
+    ),
+    Test(
+        "Default Mode - Minutes",
+        "🧪 TEST 3: Default Mode - 1 minute interval",
+        (),
+        _DEFAULT_MODE_MINUTES,
+    ),
+    Test(
+        "Customize Mode - Basic",
+        "🧪 TEST 4: Customize Mode - 2 Topics (Temperature & Pressure)",
+        (),
+        _CUSTOMIZE_MODE_BASIC,
+    ),
+    Test(
+        "Customize Mode - Mixed Intervals",
+        "🧪 TEST 5: Customize Mode - Mixed Intervals (ms/s/m)",
+        (),
+        _CUSTOMIZE_MODE_MIXED_INTERVALS,
+    ),
+    Test(
+        "Customize Mode - Register Overlap",
+        "🧪 TEST 6: Customize Mode - Register Overlap",
+        ("Register 1 → 3 topics | Register 2-3 → 2 topics | Register 4-5 → 1 topic",),
+        _CUSTOMIZE_MODE_REGISTER_OVERLAP,
+    ),
+    Test(
+        "Warehouse Scenario",
+        "🧪 TEST 7: Warehouse Monitoring Scenario",
+        (
+            "Environment: Temp (Reg 1-4), Humidity (Reg 5-8)",
+            "Safety: Smoke (Reg 9-10), CO2 (Reg 11-12)",
+        ),
+        _WAREHOUSE_SCENARIO,
+    ),
+    Test(
+        "Disable Both Modes",
+        "🧪 TEST 8: Disable Both Modes (MQTT Connected, No Publish)",
+        (),
+        _DISABLE_BOTH_MODES,
+    ),
+]
 
 
 class MqttModesTestClient:
     def __init__(self):
         self.client = None
-        self.response_buffer = ""
+        self.response_buffer = bytearray()  # Parsed once at <END>
         self.connected = False
+        self.chunk_size = 18  # Raised to the negotiated MTU on connect
+        self._write_response = True  # Cleared if the gateway allows write commands
+        self._response_ready = asyncio.Event()  # Set by the handler at <END>
 
     async def connect(self):
         """Connect to BLE service"""
         try:
             print("Scanning for BLE devices...")
-            devices = await BleakScanner.discover()
-            device = next((d for d in devices if d.name == SERVICE_NAME), None)
+            # Stops at the first matching advertisement instead of a full scan
+            device = await BleakScanner.find_device_by_name(SERVICE_NAME, timeout=5.0)
 
             if not device:
                 print(f"❌ Service {SERVICE_NAME} not found")
                 return False
 
-            self.client = BleakClient(device.address)
+            # Reuse the OS-cached GATT table instead of rediscovering services
+            # (WinRT only; BlueZ and CoreBluetooth cache on their own)
+            self.client = BleakClient(
+                device.address,
+                disconnected_callback=self._on_disconnect,
+                winrt=dict(use_cached_services=True),
+            )
             await self.client.connect()
             await self.client.start_notify(
                 RESPONSE_CHAR_UUID, self._notification_handler
             )
+            # One ATT write carries MTU - 3 bytes of payload
+            self.chunk_size = max(self.chunk_size, self.client.mtu_size - 3)
+            # Use write-without-response only if the characteristic offers it
+            # (current firmware exposes PROPERTY_WRITE only)
+            char = self.client.services.get_characteristic(COMMAND_CHAR_UUID)
+            self._write_response = not (
+                char and "write-without-response" in char.properties
+            )
 
             self.connected = True
             print(f"✅ Connected to {device.name} ({device.address})")
@@ -49,390 +399,87 @@ class MqttModesTestClient:
     async def disconnect(self):
         """Disconnect from BLE service"""
         if self.client and self.connected:
+            self.connected = False  # Expected; keeps _on_disconnect quiet
             await self.client.disconnect()
-            self.connected = False
             print("✅ Disconnected")
 
+    def _on_disconnect(self, client):
+        """Bleak callback for a dropped link; the next command reconnects"""
+        if self.connected:
+            self.connected = False
+            print("\n⚠️  Connection lost, reconnecting on the next command")
+
     def _notification_handler(self, sender, data):
         """Handle incoming response fragments"""
-        fragment = data.decode("utf-8")
-        print(f"📥 Fragment: '{fragment}'")
+        log.debug("📥 Fragment: %r", data)  # Formatted only when enabled
 
-        if fragment == "<END>":
+        if data == END_MARKER:
             print(f"\n📦 Complete response received")
             try:
-                response = json.loads(self.response_buffer)
+                response = _loads(self.response_buffer)
                 print(f"📋 Parsed response:")
-                print(json.dumps(response, indent=2))
-            except json.JSONDecodeError as e:
+                print(_pretty(response))
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
                 print(f"❌ Failed to parse response: {e}")
-                print(f"Raw buffer: {self.response_buffer}")
+                raw = self.response_buffer.decode("utf-8", "replace")
+                print(f"Raw buffer: {raw}")
             finally:
-                self.response_buffer = ""
+                self.response_buffer.clear()
+                self._response_ready.set()
         else:
-            self.response_buffer += fragment
+            self.response_buffer.extend(data)
 
-    async def send_command(self, command):
-        """Send command with automatic fragmentation"""
-        if not self.connected:
-            raise RuntimeError("Not connected to BLE service")
+    async def send_command(self, command, timeout=2.0):
+        """Serialize and send a command"""
+        await self.send_payload(_payload(command), timeout)
 
-        json_str = json.dumps(command, separators=(",", ":"))
-        print(f"\n📤 Sending command ({len(json_str)} bytes):")
-        print(json.dumps(command, indent=2))
+    async def send_payload(self, payload, timeout=2.0):
+        """Send a serialized command with automatic fragmentation
 
-        # Send with fragmentation
-        chunk_size = 18
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i : i + chunk_size]
-            await self.client.write_gatt_char(COMMAND_CHAR_UUID, chunk.encode())
-            await asyncio.sleep(0.1)
+        Returns once the response has arrived, or after timeout seconds.
+        """
+        if not self.connected:
+            # A link dropped mid-suite is re-established once
+            if not (self.client and await self.connect()):
+                raise RuntimeError("Not connected to BLE service")
+
+        print(f"\n📤 Sending command ({len(payload.data)} bytes):")
+        print(payload.pretty)
+
+        self._response_ready.clear()
+
+        # Send with fragmentation; no sleeps, the BLE stack provides flow control
+        data = payload.data
+        chunk_size = self.chunk_size
+        response = self._write_response
+        for i in range(0, len(data), chunk_size):
+            chunk = data[i : i + chunk_size]
+            await self.client.write_gatt_char(
+                COMMAND_CHAR_UUID, chunk, response=response
+            )
 
-        # Send end marker
-        await self.client.write_gatt_char(COMMAND_CHAR_UUID, "<END>".encode())
-        await asyncio.sleep(2.0)
+        # Send end marker, acknowledged so it also flushes queued commands
+        await self.client.write_gatt_char(COMMAND_CHAR_UUID, END_MARKER, response=True)
 
-    async def read_mqtt_config(self):
-        """Read current MQTT configuration"""
-        print("\n" + "=" * 60)
-        print("📖 Reading Current MQTT Configuration")
-        print("=" * 60)
-        await self.send_command({"op": "read", "type": "server_config"})
+        # Wait for the notification handler to see <END>
+        try:
+            await asyncio.wait_for(self._response_ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"No response within {timeout}s")
 
-    async def test_default_mode_seconds(self):
-        """Test DEFAULT MODE with interval in seconds"""
-        print("\n" + "=" * 60)
-        print("🧪 TEST 1: Default Mode - 5 seconds interval")
-        print("=" * 60)
-        await self.send_command(
-            {
-                "op": "update",
-                "type": "server_config",
-                "config": {
-                    "mqtt_config": {
-                        "enabled": True,
-                        "broker_address": "demo.thingsboard.io",
-                        "broker_port": 1883,
-                        "client_id": "esp32_test_default",
-                        "username": "device_token",
-                        "password": "device_password",
-                        "keep_alive": 60,
-                        "clean_session": True,
-                        "use_tls": False,
-                        "publish_mode": "default",
-                        "default_mode": {
-                            "enabled": True,
-                            "topic_publish": "v1/devices/me/telemetry",
-                            "topic_subscribe": "device/control",
-                            "interval": 5,
-                            "interval_unit": "s",
-                        },
-                        "customize_mode": {"enabled": False},
-                    }
-                },
-            }
-        )
-
-    async def test_default_mode_milliseconds(self):
-        """Test DEFAULT MODE with interval in milliseconds"""
-        print("\n" + "=" * 60)
-        print("🧪 TEST 2: Default Mode - 3000 milliseconds interval")
-        print("=" * 60)
-        await self.send_command(
-            {
-                "op": "update",
-                "type": "server_config",
-                "config": {
-                    "mqtt_config": {
-                        "enabled": True,
-                        "broker_address": "demo.thingsboard.io",
-                        "broker_port": 1883,
-                        "client_id": "esp32_test_default_ms",
-                        "username": "device_token",
-                        "password": "device_password",
-                        "keep_alive": 60,
-                        "clean_session": True,
-                        "use_tls": False,
-                        "publish_mode": "default",
-                        "default_mode": {
-                            "enabled": True,
-                            "topic_publish": "v1/devices/me/telemetry",
-                            "topic_subscribe": "device/control",
-                            "interval": 3000,
-                            "interval_unit": "ms",
-                        },
-                        "customize_mode": {"enabled": False},
-                    }
-                },
-            }
-        )
-
-    async def test_default_mode_minutes(self):
-        """Test DEFAULT MODE with interval in minutes"""
-        print("\n" + "=" * 60)
-        print("🧪 TEST 3: Default Mode - 1 minute interval")
-        print("=" * 60)
-        await self.send_command(
-            {
-                "op": "update",
-                "type": "server_config",
-                "config": {
-                    "mqtt_config": {
-                        "enabled": True,
-                        "broker_address": "demo.thingsboard.io",
-                        "broker_port": 1883,
-                        "client_id": "esp32_test_default_min",
-                        "username": "device_token",
-                        "password": "device_password",
-                        "keep_alive": 60,
-                        "clean_session": True,
-                        "use_tls": False,
-                        "publish_mode": "default",
-                        "default_mode": {
-                            "enabled": True,
-                            "topic_publish": "v1/devices/me/telemetry",
-                            "topic_subscribe": "device/control",
-                            "interval": 1,
-                            "interval_unit": "m",
-                        },
-                        "customize_mode": {"enabled": False},
-                    }
-                },
-            }
-        )
-
-    async def test_customize_mode_basic(self):
-        """Test CUSTOMIZE MODE with 2 topics"""
-        print("\n" + "=" * 60)
-        print("🧪 TEST 4: Customize Mode - 2 Topics (Temperature & Pressure)")
-        print("=" * 60)
-        await self.send_command(
-            {
-                "op": "update",
-                "type": "server_config",
-                "config": {
-                    "mqtt_config": {
-                        "enabled": True,
-                        "broker_address": "demo.thingsboard.io",
-                        "broker_port": 1883,
-                        "client_id": "esp32_test_customize",
-                        "username": "device_token",
-                        "password": "device_password",
-                        "keep_alive": 60,
-                        "clean_session": True,
-                        "use_tls": False,
-                        "publish_mode": "customize",
-                        "default_mode": {"enabled": False},
-                        "customize_mode": {
-                            "enabled": True,
-                            "custom_topics": [
-                                {
-                                    "topic": "sensor/temperature",
-                                    "registers": [1, 2, 3],
-                                    "interval": 5,
-                                    "interval_unit": "s",
-                                },
-                                {
-                                    "topic": "sensor/pressure",
-                                    "registers": [4, 5],
-                                    "interval": 10,
-                                    "interval_unit": "s",
-                                },
-                            ],
-                        },
-                    }
-                },
-            }
-        )
-
-    async def test_customize_mode_mixed_intervals(self):
-        """Test CUSTOMIZE MODE with mixed interval units"""
-        print("\n" + "=" * 60)
-        print("🧪 TEST 5: Customize Mode - Mixed Intervals (ms/s/m)")
-        print("=" * 60)
-        await self.send_command(
-            {
-                "op": "update",
-                "type": "server_config",
-                "config": {
-                    "mqtt_config": {
-                        "enabled": True,
-                        "broker_address": "demo.thingsboard.io",
-                        "broker_port": 1883,
-                        "client_id": "esp32_test_mixed",
-                        "username": "device_token",
-                        "password": "device_password",
-                        "keep_alive": 60,
-                        "clean_session": True,
-                        "use_tls": False,
-                        "publish_mode": "customize",
-                        "default_mode": {"enabled": False},
-                        "customize_mode": {
-                            "enabled": True,
-                            "custom_topics": [
-                                {
-                                    "topic": "alerts/critical",
-                                    "registers": [1, 5],
-                                    "interval": 500,
-                                    "interval_unit": "ms",
-                                },
-                                {
-                                    "topic": "dashboard/realtime",
-                                    "registers": [1, 2, 3, 4, 5, 6],
-                                    "interval": 2,
-                                    "interval_unit": "s",
-                                },
-                                {
-                                    "topic": "database/historical",
-                                    "registers": [1, 2, 3, 4, 5, 6],
-                                    "interval": 1,
-                                    "interval_unit": "m",
-                                },
-                            ],
-                        },
-                    }
-                },
-            }
-        )
-
-    async def test_customize_mode_register_overlap(self):
-        """Test CUSTOMIZE MODE with register overlap"""
-        print("\n" + "=" * 60)
-        print("🧪 TEST 6: Customize Mode - Register Overlap")
-        print("=" * 60)
-        print(
-            "Register 1 → 3 topics | Register 2-3 → 2 topics | Register 4-5 → 1 topic"
-        )
-        await self.send_command(
-            {
-                "op": "update",
-                "type": "server_config",
-                "config": {
-                    "mqtt_config": {
-                        "enabled": True,
-                        "broker_address": "demo.thingsboard.io",
-                        "broker_port": 1883,
-                        "client_id": "esp32_test_overlap",
-                        "username": "device_token",
-                        "password": "device_password",
-                        "keep_alive": 60,
-                        "clean_session": True,
-                        "use_tls": False,
-                        "publish_mode": "customize",
-                        "default_mode": {"enabled": False},
-                        "customize_mode": {
-                            "enabled": True,
-                            "custom_topics": [
-                                {
-                                    "topic": "sensor/temperature",
-                                    "registers": [1, 2, 3],
-                                    "interval": 5,
-                                    "interval_unit": "s",
-                                },
-                                {
-                                    "topic": "sensor/all_sensors",
-                                    "registers": [1, 2, 3, 4, 5],
-                                    "interval": 10,
-                                    "interval_unit": "s",
-                                },
-                                {
-                                    "topic": "sensor/critical",
-                                    "registers": [1],
-                                    "interval": 2,
-                                    "interval_unit": "s",
-                                },
-                            ],
-                        },
-                    }
-                },
-            }
-        )
-
-    async def test_warehouse_scenario(self):
-        """Test WAREHOUSE scenario with categorized sensors"""
-        print("\n" + "=" * 60)
-        print("🧪 TEST 7: Warehouse Monitoring Scenario")
-        print("=" * 60)
-        print("Environment: Temp (Reg 1-4), Humidity (Reg 5-8)")
-        print("Safety: Smoke (Reg 9-10), CO2 (Reg 11-12)")
-        await self.send_command(
-            {
-                "op": "update",
-                "type": "server_config",
-                "config": {
-                    "mqtt_config": {
-                        "enabled": True,
-                        "broker_address": "demo.thingsboard.io",
-                        "broker_port": 1883,
-                        "client_id": "warehouse_gateway",
-                        "username": "device_token",
-                        "password": "device_password",
-                        "keep_alive": 60,
-                        "clean_session": True,
-                        "use_tls": False,
-                        "publish_mode": "customize",
-                        "default_mode": {"enabled": False},
-                        "customize_mode": {
-                            "enabled": True,
-                            "custom_topics": [
-                                {
-                                    "topic": "warehouse/environment/temperature",
-                                    "registers": [1, 2, 3, 4],
-                                    "interval": 5,
-                                    "interval_unit": "s",
-                                },
-                                {
-                                    "topic": "warehouse/environment/humidity",
-                                    "registers": [5, 6, 7, 8],
-                                    "interval": 5,
-                                    "interval_unit": "s",
-                                },
-                                {
-                                    "topic": "warehouse/safety/smoke",
-                                    "registers": [9, 10],
-                                    "interval": 1,
-                                    "interval_unit": "s",
-                                },
-                                {
-                                    "topic": "warehouse/safety/co2",
-                                    "registers": [11, 12],
-                                    "interval": 2,
-                                    "interval_unit": "s",
-                                },
-                            ],
-                        },
-                    }
-                },
-            }
-        )
-
-    async def test_disable_both_modes(self):
-        """Test disabling both modes (MQTT stays connected)"""
+    async def run_test(self, test):
+        """Print a test's banner and notes, then send its command"""
         print("\n" + "=" * 60)
-        print("🧪 TEST 8: Disable Both Modes (MQTT Connected, No Publish)")
+        print(test.title)
         print("=" * 60)
-        await self.send_command(
-            {
-                "op": "update",
-                "type": "server_config",
-                "config": {
-                    "mqtt_config": {
-                        "enabled": True,
-                        "broker_address": "demo.thingsboard.io",
-                        "broker_port": 1883,
-                        "client_id": "esp32_test_disabled",
-                        "username": "device_token",
-                        "password": "device_password",
-                        "keep_alive": 60,
-                        "clean_session": True,
-                        "use_tls": False,
-                        "publish_mode": "default",
-                        "default_mode": {"enabled": False},
-                        "customize_mode": {"enabled": False},
-                    }
-                },
-            }
-        )
+        for note in test.notes:
+            print(note)
+        await self.send_payload(test.payload)
+
+
+# Menu option -> test: 1-8 are TESTS[1:] in order, 9 reads the config
+MENU_TESTS = {str(i): test for i, test in enumerate(TESTS[1:], 1)}
+MENU_TESTS["9"] = TESTS[0]
 
 
 async def run_all_tests(client):
@@ -441,29 +488,11 @@ async def run_all_tests(client):
     print("🚀 RUNNING ALL MQTT PUBLISH MODES TESTS")
     print("=" * 60)
 
-    tests = [
-        ("Read Current Config", client.read_mqtt_config),
-        ("Default Mode - Seconds", client.test_default_mode_seconds),
-        ("Default Mode - Milliseconds", client.test_default_mode_milliseconds),
-        ("Default Mode - Minutes", client.test_default_mode_minutes),
-        ("Customize Mode - Basic", client.test_customize_mode_basic),
-        (
-            "Customize Mode - Mixed Intervals",
-            client.test_customize_mode_mixed_intervals,
-        ),
-        (
-            "Customize Mode - Register Overlap",
-            client.test_customize_mode_register_overlap,
-        ),
-        ("Warehouse Scenario", client.test_warehouse_scenario),
-        ("Disable Both Modes", client.test_disable_both_modes),
-    ]
-
-    for i, (name, test_func) in enumerate(tests, 1):
+    for i, test in enumerate(TESTS, 1):
         print(f"\n{'='*60}")
-        print(f"Running Test {i}/{len(tests)}: {name}")
+        print(f"Running Test {i}/{len(TESTS)}: {test.name}")
         print(f"{'='*60}")
-        await test_func()
+        await client.run_test(test)
         await asyncio.sleep(3)  # Wait between tests
 
     print("\n" + "=" * 60)
@@ -471,6 +500,35 @@ async def run_all_tests(client):
     print("=" * 60)
 
 
+async def _ainput(prompt):
+    """input() that keeps the event loop free for BLE notifications
+
+    Reads on a daemon thread rather than asyncio.to_thread(), whose worker
+    would hold up interpreter exit after Ctrl+C until a line is entered.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(line, error):
+        if future.done():
+            return
+        if error is None:
+            future.set_result(line)
+        else:
+            future.set_exception(error)
+
+    def read():
+        try:
+            line = input(prompt)
+        except Exception as e:  # EOFError on closed stdin
+            loop.call_soon_threadsafe(resolve, None, e)
+        else:
+            loop.call_soon_threadsafe(resolve, line, None)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
 async def interactive_menu():
     """Interactive menu for MQTT modes testing"""
     client = MqttModesTestClient()
@@ -500,26 +558,11 @@ async def interactive_menu():
             print("  0. Exit")
             print("=" * 60)
 
-            choice = input("\n👉 Select option (0-10): ").strip()
-
-            if choice == "1":
-                await client.test_default_mode_seconds()
-            elif choice == "2":
-                await client.test_default_mode_milliseconds()
-            elif choice == "3":
-                await client.test_default_mode_minutes()
-            elif choice == "4":
-                await client.test_customize_mode_basic()
-            elif choice == "5":
-                await client.test_customize_mode_mixed_intervals()
-            elif choice == "6":
-                await client.test_customize_mode_register_overlap()
-            elif choice == "7":
-                await client.test_warehouse_scenario()
-            elif choice == "8":
-                await client.test_disable_both_modes()
-            elif choice == "9":
-                await client.read_mqtt_config()
+            choice = (await _ainput("\n👉 Select option (0-10): ")).strip()
+
+            test = MENU_TESTS.get(choice)
+            if test is not None:
+                await client.run_test(test)
             elif choice == "10":
                 await run_all_tests(client)
             elif choice == "0":
@@ -557,4 +600,6 @@ if __name__ == "__main__":
     """
     )
 
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(interactive_menu())
@@ -14,6 +14,11 @@ RESPONSE_CHAR_UUID = "11111111-1111-1111-1111-111111111102"
 SERVICE_NAME = "SURIOTA GW"
 
 
+def _is_gateway(device, adv):
+    """Scanner filter: stops the scan at the first matching advertisement"""
+    return device.name == SERVICE_NAME
+
+
 class ServerConfigClient:
     def __init__(self):
         self.client = None
@@ -23,8 +28,7 @@ class ServerConfigClient:
     async def connect(self):
         """Connect to BLE service"""
         try:
-            devices = await BleakScanner.discover()
-            device = next((d for d in devices if d.name == SERVICE_NAME), None)
+            device = await BleakScanner.find_device_by_filter(_is_gateway, timeout=5.0)
 
             if not device:
                 print(f"Service {SERVICE_NAME} not found")
@@ -75,13 +79,14 @@ class ServerConfigClient:
 
         json_str = json.dumps(command, separators=(",", ":"))
         print(f"Sending command: {json_str}")
+        payload = json_str.encode("utf-8")  # Encode once, slice bytes below
 
         # Send with fragmentation
         chunk_size = 18
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i : i + chunk_size]
-            print(f"Fragment: '{chunk}'")
-            await self.client.write_gatt_char(COMMAND_CHAR_UUID, chunk.encode())
+        for i in range(0, len(payload), chunk_size):
+            chunk = payload[i : i + chunk_size]
+            print(f"Fragment: {chunk!r}")
+            await self.client.write_gatt_char(COMMAND_CHAR_UUID, chunk)
             await asyncio.sleep(0.1)
 
         # Send end marker
@@ -5,26 +5,89 @@ Tests device streaming start/stop operations
 """
 
 import asyncio
+import io
 import json
 from bleak import BleakClient, BleakScanner
 
+# Optional: orjson serializes straight to compact UTF-8 bytes and parses faster
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+# Optional: ijson reports the top-level status before the response is complete
+try:
+    import ijson
+
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Optional: uvloop is a faster event loop (Linux/macOS only)
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# BLE Configuration
+COMMAND_CHAR_UUID = "11111111-1111-1111-1111-111111111101"
+RESPONSE_CHAR_UUID = "11111111-1111-1111-1111-111111111102"
+END_MARKER = b"<END>"  # Frame terminator, compared as raw bytes
+
+
+def _is_gateway(device, adv):
+    """Scanner filter: stops the scan at the first matching advertisement"""
+    return bool(device.name) and "SURIOTA" in device.name
+
 
 class StreamingTester:
     def __init__(self):
         self.client = None
-        self.response_buffer = ""
+        # Parsed once at <END>; BytesIO grows geometrically over long streams
+        self.response_buffer = io.BytesIO()
+        self.chunk_size = 18  # Raised to the negotiated MTU on connect
+        self._write_response = True  # Cleared if the gateway allows write commands
+        self._response_ready = asyncio.Event()  # Set by the handler at <END>
+        # Incremental parse of the response in flight, until its status is seen
+        self._events = ijson.sendable_list() if IJSON_AVAILABLE else None
+        self._status_parser = self._new_status_parser()
 
     async def connect(self):
         print("Scanning for SURIOTA CRUD Service...")
-        devices = await BleakScanner.discover()
-        device = next((d for d in devices if d.name and "SURIOTA" in d.name), None)
+        device = await BleakScanner.find_device_by_filter(_is_gateway, timeout=5.0)
 
         if device:
             print(f"Found device: {device.name} ({device.address})")
-            self.client = BleakClient(device.address)
+            # Reuse the OS-cached GATT table instead of rediscovering services
+            # (WinRT only; BlueZ and CoreBluetooth cache on their own)
+            self.client = BleakClient(
+                device.address, winrt=dict(use_cached_services=True)
+            )
             await self.client.connect()
             await self.client.start_notify(
-                "11111111-1111-1111-1111-111111111102", self._notification_handler
+                RESPONSE_CHAR_UUID, self._notification_handler
+            )
+            # One ATT write carries MTU - 3 bytes of payload
+            self.chunk_size = max(self.chunk_size, self.client.mtu_size - 3)
+            # Use write-without-response only if the characteristic offers it
+            # (current firmware exposes PROPERTY_WRITE only)
+            char = self.client.services.get_characteristic(COMMAND_CHAR_UUID)
+            self._write_response = not (
+                char and "write-without-response" in char.properties
             )
             print("Connected successfully!")
             return True
@@ -33,35 +96,62 @@ class StreamingTester:
             return False
 
     def _notification_handler(self, sender, data):
-        fragment = data.decode("utf-8")
-        if fragment == "<END>":
+        if data == END_MARKER:
+            raw = self.response_buffer.getvalue()
+            self.response_buffer = io.BytesIO()
+            self._status_parser = self._new_status_parser()
             try:
-                response = json.loads(self.response_buffer)
+                response = _loads(raw)
                 print(f"Response: {json.dumps(response, indent=2)}")
-            except json.JSONDecodeError:
-                print(f"Invalid JSON response: {self.response_buffer}")
-            self.response_buffer = ""
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                print(f"Invalid JSON response: {raw.decode('utf-8', 'replace')}")
+            self._response_ready.set()
         else:
-            self.response_buffer += fragment
-
-    async def send_command(self, command):
-        json_str = json.dumps(command, separators=(",", ":"))
-        print(f"Sending: {json_str}")
-
-        # Send with fragmentation
-        chunk_size = 18
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i : i + chunk_size]
+            self.response_buffer.write(data)
+            if self._status_parser is not None:
+                self._status_parser = self._scan_status(data)
+
+    def _new_status_parser(self):
+        if not IJSON_AVAILABLE:
+            return None
+        del self._events[:]
+        return ijson.parse_coro(self._events)
+
+    def _scan_status(self, data):
+        """Feed one fragment; returns None once the status is printed or unparseable"""
+        try:
+            self._status_parser.send(data)
+        except ijson.JSONError:
+            return None
+        for prefix, event, value in self._events:
+            if prefix == "status" and event == "string":
+                print(f"Status: {value}")
+                return None
+        del self._events[:]
+        return self._status_parser
+
+    async def send_command(self, command, timeout=2.0):
+        payload = _dumps(command)  # Compact UTF-8 bytes
+        print(f"Sending: {payload.decode('utf-8')}")
+        self._response_ready.clear()
+
+        # Send with fragmentation; no sleeps, the BLE stack provides flow control
+        chunk_size = self.chunk_size
+        response = self._write_response
+        for i in range(0, len(payload), chunk_size):
+            chunk = payload[i : i + chunk_size]
             await self.client.write_gatt_char(
-                "11111111-1111-1111-1111-111111111101", chunk.encode()
+                COMMAND_CHAR_UUID, chunk, response=response
             )
-            await asyncio.sleep(0.1)
 
-        # Send end marker
-        await self.client.write_gatt_char(
-            "11111111-1111-1111-1111-111111111101", "<END>".encode()
-        )
-        await asyncio.sleep(2)  # Wait for response
+        # Send end marker, acknowledged so it also flushes queued commands
+        await self.client.write_gatt_char(COMMAND_CHAR_UUID, END_MARKER, response=True)
+
+        # Wait for the notification handler to see <END>
+        try:
+            await asyncio.wait_for(self._response_ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"No response within {timeout}s")
 
 
 async def test_streaming():
@@ -70,54 +160,61 @@ async def test_streaming():
     if not await tester.connect():
         return
 
-    print("\n=== Testing Data Streaming ===")
-
-    # Test 1: List devices to get device ID
-    print("\n1. Listing devices to get device ID...")
-    await tester.send_command({"op": "read", "type": "devices"})
+    try:
+        print("\n=== Testing Data Streaming ===")
 
-    # Test 2: Get devices summary
-    print("\n2. Getting devices summary...")
-    await tester.send_command({"op": "read", "type": "devices_summary"})
+        # Test 1: List devices to get device ID
+        print("\n1. Listing devices to get device ID...")
+        await tester.send_command({"op": "read", "type": "devices"})
 
-    # Test 3: Start streaming for a specific device
-    # Replace with actual device ID from step 1
-    device_id = "Dca4cf"  # Use the device ID from your log
-    print(f"\n3. Starting streaming for device {device_id}...")
-    await tester.send_command({"op": "read", "type": "data", "device_id": device_id})
+        # Test 2: Get devices summary
+        print("\n2. Getting devices summary...")
+        await tester.send_command({"op": "read", "type": "devices_summary"})
 
-    # Test 4: Wait for streaming data
-    print("\n4. Waiting for streaming data (30 seconds)...")
-    print("You should see streaming data responses now...")
-    await asyncio.sleep(30)
+        # Test 3: Start streaming for a specific device
+        # Replace with actual device ID from step 1
+        device_id = "Dca4cf"  # Use the device ID from your log
+        print(f"\n3. Starting streaming for device {device_id}...")
+        await tester.send_command(
+            {"op": "read", "type": "data", "device_id": device_id}
+        )
 
-    # Test 5: Stop streaming
-    print("\n5. Stopping streaming...")
-    await tester.send_command({"op": "read", "type": "data", "device_id": "stop"})
+        # Test 4: Wait for streaming data
+        print("\n4. Waiting for streaming data (30 seconds)...")
+        print("You should see streaming data responses now...")
+        await asyncio.sleep(30)
 
-    # Test 6: Try streaming with different device ID
-    print("\n6. Testing with different device ID (should not match)...")
-    await tester.send_command(
-        {"op": "read", "type": "data", "device_id": "NONEXISTENT"}
-    )
+        # Test 5: Stop streaming
+        print("\n5. Stopping streaming...")
+        await tester.send_command({"op": "read", "type": "data", "device_id": "stop"})
 
-    await asyncio.sleep(5)
+        # Test 6: Try streaming with different device ID
+        print("\n6. Testing with different device ID (should not match)...")
+        await tester.send_command(
+            {"op": "read", "type": "data", "device_id": "NONEXISTENT"}
+        )
 
-    # Test 7: Start streaming again
-    print(f"\n7. Restarting streaming for device {device_id}...")
-    await tester.send_command({"op": "read", "type": "data", "device_id": device_id})
+        await asyncio.sleep(5)
 
-    await asyncio.sleep(10)
+        # Test 7: Start streaming again
+        print(f"\n7. Restarting streaming for device {device_id}...")
+        await tester.send_command(
+            {"op": "read", "type": "data", "device_id": device_id}
+        )
 
-    # Test 8: Final stop
-    print("\n8. Final stop streaming...")
-    await tester.send_command({"op": "read", "type": "data", "device_id": "stop"})
+        await asyncio.sleep(10)
 
-    print("\n=== Streaming Tests Completed ===")
+        # Test 8: Final stop
+        print("\n8. Final stop streaming...")
+        await tester.send_command({"op": "read", "type": "data", "device_id": "stop"})
 
-    if tester.client:
+        print("\n=== Streaming Tests Completed ===")
+    finally:
+        # Also on Ctrl+C or an error, so the gateway sees a clean disconnect
         await tester.client.disconnect()
 
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(test_streaming())
@@ -5,63 +5,43 @@ Tests device and register update functionality
 """
 
 import asyncio
-import json
-from bleak import BleakClient, BleakScanner
+import os
+import sys
 
+# Add parent directory to path for shared module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-class BLEUpdateTester:
-    def __init__(self):
-        self.client = None
-        self.response_buffer = ""
+from ble_common import BLEClient, encode_command, find_gateway
 
+
+class BLEUpdateTester(BLEClient):
     async def connect(self):
+        # Skips the scan when the gateway from the last run answers directly
+        if await self.connect_cached():
+            print(f"Connected to known device ({self.client.address})")
+            return True
+
         print("Scanning for SURIOTA CRUD Service...")
-        devices = await BleakScanner.discover()
-        device = next((d for d in devices if d.name and "SURIOTA" in d.name), None)
+        # Stops at the first gateway advertisement instead of a full scan
+        device = await find_gateway(timeout=5.0)
 
         if device:
             print(f"Found device: {device.name} ({device.address})")
-            self.client = BleakClient(device.address)
-            await self.client.connect()
-            await self.client.start_notify(
-                "11111111-1111-1111-1111-111111111102", self._notification_handler
-            )
+            await self.connect_to(device.address)
             print("Connected successfully!")
             return True
         else:
             print("SURIOTA device not found")
             return False
 
-    def _notification_handler(self, sender, data):
-        fragment = data.decode("utf-8")
-        if fragment == "<END>":
-            try:
-                response = json.loads(self.response_buffer)
-                print(f"Response: {json.dumps(response, indent=2)}")
-            except json.JSONDecodeError:
-                print(f"Invalid JSON response: {self.response_buffer}")
-            self.response_buffer = ""
-        else:
-            self.response_buffer += fragment
-
-    async def send_command(self, command):
-        json_str = json.dumps(command, separators=(",", ":"))
-        print(f"Sending: {json_str}")
-
-        # Send with fragmentation
-        chunk_size = 18
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i : i + chunk_size]
-            await self.client.write_gatt_char(
-                "11111111-1111-1111-1111-111111111101", chunk.encode()
-            )
-            await asyncio.sleep(0.1)
+    async def send_command(self, command, timeout=2.0):
+        payload = encode_command(command)  # Compact UTF-8 bytes
+        print(f"Sending: {payload.decode('utf-8')}")
+        await self.write_payload(payload)
 
-        # Send end marker
-        await self.client.write_gatt_char(
-            "11111111-1111-1111-1111-111111111101", "<END>".encode()
-        )
-        await asyncio.sleep(2)  # Wait for response
+        # Wait for the parser to see <END>
+        if not await self.wait_response(timeout):
+            print(f"No response within {timeout}s")
 
 
 async def test_update_operations():
@@ -165,8 +145,7 @@ async def test_update_operations():
 
     print("\n=== Update Tests Completed ===")
 
-    if tester.client:
-        await tester.client.disconnect()
+    await tester.disconnect()
 
 
 if __name__ == "__main__":
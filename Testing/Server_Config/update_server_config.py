@@ -20,38 +20,110 @@ Firmware: SRT-MGATE-1210 v2.2.0
 
 import asyncio
 import json
-from bleak import BleakClient, BleakScanner
+import os
+import sys
+
+# Add parent directory to path for shared module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ble_common import BLEClient, encode_command, find_gateway
 
 # =============================================================================
 # BLE Configuration (from API.md)
 # =============================================================================
-SERVICE_UUID = "00001830-0000-1000-8000-00805f9b34fb"
-COMMAND_CHAR_UUID = "11111111-1111-1111-1111-111111111101"
-RESPONSE_CHAR_UUID = "11111111-1111-1111-1111-111111111102"
 SERVICE_NAME = "SURIOTA GW"
 
+# Per-fragment log lines and indented responses only when SURIOTA_VERBOSE
+# is set in the environment
+VERBOSE = bool(os.environ.get("SURIOTA_VERBOSE"))
+
+
+# =============================================================================
+# Server Config Update Payload
+# =============================================================================
+SERVER_CONFIG = {
+    "op": "update",
+    "type": "server_config",
+    "config": {
+        "communication": {"mode": "WiFi"},
+        "wifi": {
+            "enabled": True,
+            "ssid": "SURIOTA 5G 25",
+            "password": "Tampan12",
+        },
+        "ethernet": {
+            "enabled": False,
+            "use_dhcp": True,
+            "static_ip": "",
+            "gateway": "",
+            "subnet": "",
+        },
+        "protocol": "mqtt",
+        "mqtt_config": {
+            "enabled": True,
+            "broker_address": "broker.hivemq.com",
+            "broker_port": 1883,
+            "client_id": "SuriotaGateway-001",
+            "username": "",
+            "password": "",
+            "keep_alive": 60,
+            "clean_session": True,
+            "use_tls": False,
+            "publish_mode": "default",
+            "default_mode": {
+                "enabled": True,
+                "topic_publish": "v1/devices/me/telemetry/gwsrt",
+                "topic_subscribe": "v1/devices/me/rpc",
+                "interval": 20,
+                "interval_unit": "s",
+            },
+            "customize_mode": {"enabled": False, "custom_topics": []},
+        },
+        "http_config": {
+            "enabled": False,
+            "endpoint_url": "",
+            "method": "POST",
+            "body_format": "json",
+            "timeout": 5000,
+            "retry": 3,
+            "interval": 5,
+            "interval_unit": "s",
+            "headers": {},
+        },
+    },
+}
+
+# Serialized once at import; sent as-is by update_server_config()
+SERVER_CONFIG_PAYLOAD = encode_command(SERVER_CONFIG)
+
+
+def _print_fragment(number, total, size):
+    print(f"[FRAGMENT {number}/{total}] {size} bytes")
+
 
 # =============================================================================
 # Server Config Update Class
 # =============================================================================
-class ServerConfigClient:
+class ServerConfigClient(BLEClient):
     """
     BLE Client for updating server configuration
     """
 
-    def __init__(self):
-        self.client = None
-        self.response_buffer = ""
-        self.connected = False
+    EARLY_STATUS = True  # Report as soon as the status has streamed in
 
     async def connect(self):
         """
         Scan and connect to SURIOTA Gateway via BLE
         """
         try:
+            # Skips the scan when the gateway from the last run answers directly
+            if await self.connect_cached():
+                print(f"[SUCCESS] Connected to known device ({self.client.address})")
+                return True
+
             print(f"[SCAN] Scanning for '{SERVICE_NAME}'...")
-            devices = await BleakScanner.discover(timeout=10.0)
-            device = next((d for d in devices if d.name == SERVICE_NAME), None)
+            # Matches the advertised service UUID; stops at the first gateway
+            device = await find_gateway(timeout=10.0)
 
             if not device:
                 print(f"[ERROR] Service '{SERVICE_NAME}' not found")
@@ -62,13 +134,7 @@ class ServerConfigClient:
                 return False
 
             print(f"[FOUND] {device.name} ({device.address})")
-            self.client = BleakClient(device.address)
-            await self.client.connect()
-            await self.client.start_notify(
-                RESPONSE_CHAR_UUID, self._notification_handler
-            )
-
-            self.connected = True
+            await self.connect_to(device.address)
             print(f"[SUCCESS] Connected to {device.name}")
             return True
 
@@ -80,54 +146,63 @@ class ServerConfigClient:
         """
         Disconnect from BLE device
         """
-        if self.client and self.connected:
-            await self.client.disconnect()
-            self.connected = False
+        if await super().disconnect():
             print("[DISCONNECT] Connection closed")
 
-    def _notification_handler(self, sender, data):
+    def handle_link_lost(self):
         """
-        Handle BLE notification responses with fragmentation support
+        Report the gateway dropping the link (it restarts after an update)
         """
-        fragment = data.decode("utf-8")
-
-        if fragment == "<END>":
-            if self.response_buffer:
-                try:
-                    response = json.loads(self.response_buffer)
-                    print(f"[RESPONSE] {json.dumps(response, indent=2)}")
-
-                    # Check if server config update was successful
-                    if response.get("status") == "ok":
-                        print("\n" + "=" * 70)
-                        print("✅ SERVER CONFIGURATION UPDATED SUCCESSFULLY!")
-                        print("=" * 70)
-                        print("\n⚠️  WARNING: Device will restart in 5 seconds...")
-                        print("    Please wait for the device to reboot.")
-                        print("\n📋 Configuration Summary:")
-                        print("    • Communication Mode: Ethernet (DHCP)")
-                        print("    • WiFi: Enabled (SSID: KOWI)")
-                        print("    • MQTT: Enabled (broker.hivemq.com)")
-                        print("    • MQTT Mode: Default Mode (20s interval)")
-                        print("    • HTTP: Disabled")
-                        print("=" * 70)
-                    elif response.get("status") == "error":
-                        print("\n" + "=" * 70)
-                        print("❌ SERVER CONFIGURATION UPDATE FAILED!")
-                        print("=" * 70)
-                        error_code = response.get("code", "UNKNOWN")
-                        error_msg = response.get("message", "No error message")
-                        print(f"    Error Code: {error_code}")
-                        print(f"    Error Message: {error_msg}")
-                        print("=" * 70)
-
-                except json.JSONDecodeError as e:
-                    print(f"[ERROR] JSON Parse: {e}")
-                    print(f"[DEBUG] Buffer content: {self.response_buffer}")
-                finally:
-                    self.response_buffer = ""
+        print("[DISCONNECT] Connection closed by device")
+
+    def handle_status(self, status):
+        """
+        Report the status as soon as it has streamed in
+        """
+        print(f"[STATUS] {status}")
+
+    def handle_invalid(self, raw, error):
+        """
+        Report a response that is not valid JSON
+        """
+        print(f"[ERROR] JSON Parse: {error}")
+        print(f"[DEBUG] Buffer content: {raw.decode('utf-8', 'replace')}")
+
+    def handle_response(self, response, raw):
+        """
+        Report the response and summarize the update outcome
+        """
+        if VERBOSE:
+            print(f"[RESPONSE] {json.dumps(response, indent=2)}")
         else:
-            self.response_buffer += fragment
+            # The summary below reports the outcome; skip re-encoding
+            text = raw.decode("utf-8", "replace")
+            more = "..." if len(text) > 200 else ""
+            print(f"[RESPONSE] {text[:200]}{more}")
+
+        # Check if server config update was successful
+        if response.get("status") == "ok":
+            print("\n" + "=" * 70)
+            print("✅ SERVER CONFIGURATION UPDATED SUCCESSFULLY!")
+            print("=" * 70)
+            print("\n⚠️  WARNING: Device will restart in 5 seconds...")
+            print("    Please wait for the device to reboot.")
+            print("\n📋 Configuration Summary:")
+            print("    • Communication Mode: Ethernet (DHCP)")
+            print("    • WiFi: Enabled (SSID: KOWI)")
+            print("    • MQTT: Enabled (broker.hivemq.com)")
+            print("    • MQTT Mode: Default Mode (20s interval)")
+            print("    • HTTP: Disabled")
+            print("=" * 70)
+        elif response.get("status") == "error":
+            print("\n" + "=" * 70)
+            print("❌ SERVER CONFIGURATION UPDATE FAILED!")
+            print("=" * 70)
+            error_code = response.get("code", "UNKNOWN")
+            error_msg = response.get("message", "No error message")
+            print(f"    Error Code: {error_code}")
+            print(f"    Error Message: {error_msg}")
+            print("=" * 70)
 
     async def send_command(self, command, description=""):
         """
@@ -137,32 +212,29 @@ class ServerConfigClient:
             command (dict): JSON command object
             description (str): Human-readable description for logging
         """
-        if not self.connected:
-            raise RuntimeError("Not connected to BLE device")
+        await self.send_payload(encode_command(command), description)
 
-        json_str = json.dumps(command, separators=(",", ":"))
+    async def send_payload(self, payload, description=""):
+        """
+        Send an already serialized command with fragmentation
 
+        Args:
+            payload (bytes): Compact UTF-8 JSON command
+            description (str): Human-readable description for logging
+        """
         if description:
             print(f"\n[COMMAND] {description}")
-        print(f"[DEBUG] Payload size: {len(json_str)} bytes")
-
-        # Fragmentation: 18 bytes per chunk (BLE MTU limitation)
-        chunk_size = 18
-        total_chunks = (len(json_str) + chunk_size - 1) // chunk_size
-        print(f"[INFO] Sending {total_chunks} fragments...")
-
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i : i + chunk_size]
-            chunk_num = (i // chunk_size) + 1
-            print(f"[FRAGMENT {chunk_num}/{total_chunks}] {len(chunk)} bytes")
-            await self.client.write_gatt_char(COMMAND_CHAR_UUID, chunk.encode())
-            await asyncio.sleep(0.1)  # Delay for stable transmission
-
-        # Send end marker
-        print(f"[END] Sending termination marker...")
-        await self.client.write_gatt_char(COMMAND_CHAR_UUID, "<END>".encode())
+        print(f"[DEBUG] Payload size: {len(payload)} bytes")
+
+        # Fragmentation: MTU - 3 bytes per chunk (18 at the default MTU)
+        total_chunks = (len(payload) + self.chunk_size - 1) // self.chunk_size
+        print(f"[INFO] Sending {total_chunks} fragments + termination marker...")
+
+        await self.write_payload(payload, _print_fragment if VERBOSE else None)
         print(f"[WAIT] Waiting for response...")
-        await asyncio.sleep(3.0)  # Wait for response
+        # Returns as soon as the status has streamed in
+        if not await self.wait_response(3.0):
+            print("[TIMEOUT] No response within 3.0s")
 
     async def update_server_config(self):
         """
@@ -190,63 +262,8 @@ class ServerConfigClient:
         print("    • HTTP: Disabled")
         print("=" * 70)
 
-        # =============================================================================
-        # Server Config Update Payload
-        # =============================================================================
-        server_config = {
-            "op": "update",
-            "type": "server_config",
-            "config": {
-                "communication": {"mode": "WiFi"},
-                "wifi": {
-                    "enabled": True,
-                    "ssid": "SURIOTA 5G 25",
-                    "password": "Tampan12",
-                },
-                "ethernet": {
-                    "enabled": False,
-                    "use_dhcp": True,
-                    "static_ip": "",
-                    "gateway": "",
-                    "subnet": "",
-                },
-                "protocol": "mqtt",
-                "mqtt_config": {
-                    "enabled": True,
-                    "broker_address": "broker.hivemq.com",
-                    "broker_port": 1883,
-                    "client_id": "SuriotaGateway-001",
-                    "username": "",
-                    "password": "",
-                    "keep_alive": 60,
-                    "clean_session": True,
-                    "use_tls": False,
-                    "publish_mode": "default",
-                    "default_mode": {
-                        "enabled": True,
-                        "topic_publish": "v1/devices/me/telemetry/gwsrt",
-                        "topic_subscribe": "v1/devices/me/rpc",
-                        "interval": 20,
-                        "interval_unit": "s",
-                    },
-                    "customize_mode": {"enabled": False, "custom_topics": []},
-                },
-                "http_config": {
-                    "enabled": False,
-                    "endpoint_url": "",
-                    "method": "POST",
-                    "body_format": "json",
-                    "timeout": 5000,
-                    "retry": 3,
-                    "interval": 5,
-                    "interval_unit": "s",
-                    "headers": {},
-                },
-            },
-        }
-
         print("\n>>> Sending server_config update command...")
-        await self.send_command(server_config, "Update Server Configuration")
+        await self.send_payload(SERVER_CONFIG_PAYLOAD, "Update Server Configuration")
 
         print("\n✅ Command sent successfully!")
         print("⏳ Waiting for device to process and restart...")
@@ -269,9 +286,9 @@ async def main():
         # Update server configuration
         await client.update_server_config()
 
-        # Wait a bit for device restart notification
-        print("\n[INFO] Waiting 5 seconds before disconnecting...")
-        await asyncio.sleep(5.0)
+        # Returns as soon as the device drops the link to restart
+        print("\n[INFO] Waiting up to 5 seconds for the device to restart...")
+        await client.wait_for_disconnect(5.0)
 
     except Exception as e:
         print(f"\n[EXCEPTION] {e}")
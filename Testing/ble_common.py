@@ -20,15 +20,33 @@ Dependencies:
 """
 
 import asyncio
+import contextlib
+import importlib.util
 import json
+import os
 import sys
+import threading
 import time
 from datetime import datetime
 
 # =============================================================================
-# Rich Library Import (with fallback to basic output)
+# Rich Library Import (deferred to first use, with fallback to basic output)
 # =============================================================================
-try:
+# Importing Rich takes ~100 ms; scripts that only need the BLE helpers
+# (e.g. find_gateway) never pay for it
+RICH_AVAILABLE = importlib.util.find_spec("rich") is not None
+
+
+def _load_rich():
+    """Import Rich and build the themed console on first use; returns it"""
+    global console, custom_theme, Table, Panel, Text, Layout, Live
+    global Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+    global ROUNDED, DOUBLE, SIMPLE
+    global _OK_PREFIX, _ERROR_PREFIX, _WARN_PREFIX, _INFO_PREFIX
+
+    if not isinstance(console, _DeferredConsole):
+        return console
+
     from rich.console import Console
     from rich.table import Table
     from rich.panel import Panel
@@ -43,8 +61,6 @@ try:
     from rich.box import ROUNDED, DOUBLE, SIMPLE
     from rich.layout import Layout
     from rich.live import Live
-    from rich import print as rprint
-    from rich.style import Style
     from rich.theme import Theme
 
     # Custom theme for SURIOTA
@@ -59,10 +75,33 @@ try:
         }
     )
 
+    # Status prefixes for the message helpers, styled once instead of
+    # parsing their markup on every log line
+    _OK_PREFIX = Text.assemble("  ", ("[OK]", "success"))
+    _ERROR_PREFIX = Text.assemble("  ", ("[ERROR]", "error"))
+    _WARN_PREFIX = Text.assemble("  ", ("[WARN]", "warning"))
+    _INFO_PREFIX = Text.assemble("  ", ("[INFO]", "info"))
+
     console = Console(theme=custom_theme)
-    RICH_AVAILABLE = True
-except ImportError:
-    RICH_AVAILABLE = False
+    return console
+
+
+class _DeferredConsole:
+    """Stands in for the Rich console; the first use loads Rich"""
+
+    def __getattr__(self, name):
+        return getattr(_load_rich(), name)
+
+
+if RICH_AVAILABLE:
+    console = _DeferredConsole()
+
+    def rprint(*args, **kwargs):
+        from rich import print as rich_print
+
+        rich_print(*args, **kwargs)
+
+else:
     console = None
 
     # Fallback to basic print
@@ -89,6 +128,11 @@ except ImportError:
         BRIGHT = DIM = RESET_ALL = ""
 
 
+# Printed once per response notification; written straight to stdout since
+# a Rich console.print per fragment would stall the notification handler
+_PROGRESS_DOT = f"{Fore.CYAN}.{Style.RESET_ALL}"
+
+
 # =============================================================================
 # BLE Library Import
 # =============================================================================
@@ -105,12 +149,43 @@ except ImportError:
     else:
         print("ERROR: bleak module not found. Install with: pip install bleak")
 
+# =============================================================================
+# JSON Library Import (optional fast paths)
+# =============================================================================
+# orjson serializes straight to compact UTF-8 bytes and parses faster
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ijson reports the top-level status before a response is complete
+try:
+    import ijson
+
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    encode_command = orjson.dumps
+    _loads = orjson.loads
+else:
+
+    def encode_command(command):
+        """Serialize a command to compact UTF-8 JSON bytes"""
+        return json.dumps(command, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
 # =============================================================================
 # BLE Configuration - Updated for v1.0.0+
 # =============================================================================
 SERVICE_UUID = "00001830-0000-1000-8000-00805f9b34fb"
 COMMAND_CHAR_UUID = "11111111-1111-1111-1111-111111111101"
 RESPONSE_CHAR_UUID = "11111111-1111-1111-1111-111111111102"
+END_MARKER = b"<END>"  # Frame terminator, compared as raw bytes
 
 # Device name patterns (checked in order)
 # v1.0.0+:   MGate-1210(P)-XXXX or MGate-1210-XXXX
@@ -119,6 +194,11 @@ RESPONSE_CHAR_UUID = "11111111-1111-1111-1111-111111111102"
 DEVICE_NAME_PREFIX = "MGate-1210"
 DEVICE_NAME_LEGACY_PREFIX = "SURIOTA-"
 DEVICE_NAME_LEGACY = "SURIOTA GW"
+# Checked with a single startswith() call per advertisement
+_DEVICE_NAME_PREFIXES = (DEVICE_NAME_PREFIX, DEVICE_NAME_LEGACY_PREFIX)
+
+# Address of the last gateway connected to; lets BLEClient skip the scan
+KNOWN_DEVICE_FILE = os.path.expanduser("~/.suriota/known_device.json")
 
 # =============================================================================
 # Enhanced UI Functions (Rich-based)
@@ -128,6 +208,7 @@ DEVICE_NAME_LEGACY = "SURIOTA GW"
 def print_header(title, subtitle="", version=""):
     """Print a beautiful header box"""
     if RICH_AVAILABLE:
+        _load_rich()
         header_text = Text()
         header_text.append(f"{title}\n", style="bold white")
         if subtitle:
@@ -171,56 +252,63 @@ def print_section(title, icon=""):
         print()
 
 
-def print_step(step_num, total, message):
-    """Print a step indicator"""
-    if RICH_AVAILABLE:
-        console.print(f"  [dim]Step {step_num}/{total}:[/dim] [white]{message}[/white]")
-    else:
-        print(f"  Step {step_num}/{total}: {message}")
-
-
-def print_success(message):
-    """Print a success message"""
-    if RICH_AVAILABLE:
-        console.print(f"  [success][OK][/success] {message}")
-    else:
-        print(f"  [OK] {message}")
+# Message helpers are called on every log line; pick the Rich or plain
+# implementation once at import instead of branching on each call
+if RICH_AVAILABLE:
 
+    def print_step(step_num, total, message):
+        """Print a step indicator"""
+        console.print(f"  [dim]Step {step_num}/{total}:[/dim] [white]{message}[/white]")
 
-def print_error(message):
-    """Print an error message"""
-    if RICH_AVAILABLE:
-        console.print(f"  [error][ERROR][/error] {message}")
-    else:
-        print(f"  [ERROR] {message}")
+    def print_success(message):
+        """Print a success message"""
+        _load_rich().print(_OK_PREFIX, message)
 
+    def print_error(message):
+        """Print an error message"""
+        _load_rich().print(_ERROR_PREFIX, message)
 
-def print_warning(message):
-    """Print a warning message"""
-    if RICH_AVAILABLE:
-        console.print(f"  [warning][WARN][/warning] {message}")
-    else:
-        print(f"  [WARN] {message}")
+    def print_warning(message):
+        """Print a warning message"""
+        _load_rich().print(_WARN_PREFIX, message)
 
+    def print_info(message):
+        """Print an info message"""
+        _load_rich().print(_INFO_PREFIX, message)
 
-def print_info(message):
-    """Print an info message"""
-    if RICH_AVAILABLE:
-        console.print(f"  [info][INFO][/info] {message}")
-    else:
-        print(f"  [INFO] {message}")
-
-
-def print_data(label, value, unit=""):
-    """Print a data point"""
-    if RICH_AVAILABLE:
+    def print_data(label, value, unit=""):
+        """Print a data point"""
         if unit:
             console.print(
                 f"  [dim]{label}:[/dim] [white]{value}[/white] [cyan]{unit}[/cyan]"
             )
         else:
             console.print(f"  [dim]{label}:[/dim] [white]{value}[/white]")
-    else:
+
+else:
+
+    def print_step(step_num, total, message):
+        """Print a step indicator"""
+        print(f"  Step {step_num}/{total}: {message}")
+
+    def print_success(message):
+        """Print a success message"""
+        print(f"  [OK] {message}")
+
+    def print_error(message):
+        """Print an error message"""
+        print(f"  [ERROR] {message}")
+
+    def print_warning(message):
+        """Print a warning message"""
+        print(f"  [WARN] {message}")
+
+    def print_info(message):
+        """Print an info message"""
+        print(f"  [INFO] {message}")
+
+    def print_data(label, value, unit=""):
+        """Print a data point"""
         if unit:
             print(f"  {label}: {value} {unit}")
         else:
@@ -230,6 +318,7 @@ def print_data(label, value, unit=""):
 def print_table(headers, rows, title=""):
     """Print a formatted table"""
     if RICH_AVAILABLE:
+        _load_rich()
         table = Table(
             title=title, box=ROUNDED, border_style="cyan", header_style="bold magenta"
         )
@@ -269,6 +358,7 @@ def print_table(headers, rows, title=""):
 def print_box(title, content, style="info"):
     """Print content in a box"""
     if RICH_AVAILABLE:
+        _load_rich()
         if isinstance(content, dict):
             text = Text()
             for key, value in content.items():
@@ -319,6 +409,7 @@ def print_progress_bar(progress, total=100, prefix="Progress", suffix=""):
 def print_summary(title, data, success=True):
     """Print a summary box"""
     if RICH_AVAILABLE:
+        _load_rich()
         text = Text()
         for key, value in data.items():
             text.append(f"{key}: ", style="dim")
@@ -350,9 +441,10 @@ def print_summary(title, data, success=True):
         print()
 
 
-def countdown(seconds, message="Starting in"):
-    """Display a countdown"""
+def _countdown_steps(seconds, message):
+    """Display a countdown, yielding once per second for the caller to wait"""
     if RICH_AVAILABLE:
+        _load_rich()
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -361,18 +453,34 @@ def countdown(seconds, message="Starting in"):
             task = progress.add_task(f"{message} {seconds}s...", total=seconds)
             for i in range(seconds, 0, -1):
                 progress.update(task, description=f"{message} {i}s...")
-                time.sleep(1)
+                yield
                 progress.advance(task)
     else:
         for i in range(seconds, 0, -1):
             print(f"\r  {message} {i}s...", end="")
-            time.sleep(1)
+            yield
         print()
 
 
+def countdown(seconds, message="Starting in"):
+    """Display a countdown"""
+    for _ in _countdown_steps(seconds, message):
+        time.sleep(1)
+
+
+async def acountdown(seconds, message="Starting in"):
+    """Display a countdown without blocking the event loop
+
+    Use from coroutines so BLE notifications keep being handled.
+    """
+    for _ in _countdown_steps(seconds, message):
+        await asyncio.sleep(1)
+
+
 def create_progress():
     """Create a Rich progress bar context manager"""
     if RICH_AVAILABLE:
+        _load_rich()
         return Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -406,71 +514,384 @@ def check_dependencies():
     return True
 
 
+# =============================================================================
+# Gateway Discovery
+# =============================================================================
+def is_gateway_name(name):
+    """Check if an advertised name matches one of the gateway name patterns"""
+    # MGate-1210(P)-XXXX / MGate-1210-XXXX, SURIOTA-XXXXXX, or SURIOTA GW
+    return bool(name) and (
+        name.startswith(_DEVICE_NAME_PREFIXES) or name == DEVICE_NAME_LEGACY
+    )
+
+
+def is_gateway_advertisement(device, adv):
+    """BleakScanner filter: gateway service UUID or a gateway device name"""
+    return SERVICE_UUID in adv.service_uuids or is_gateway_name(device.name)
+
+
+async def find_gateway(timeout=10):
+    """Return the first gateway heard advertising, or None
+
+    Stops scanning at the first match instead of waiting out a full
+    discover() window.
+    """
+    return await BleakScanner.find_device_by_filter(
+        is_gateway_advertisement, timeout=timeout
+    )
+
+
+def _load_cached_mac():
+    """Return the address saved by _save_cached_mac(), or None"""
+    try:
+        with open(KNOWN_DEVICE_FILE, encoding="utf-8") as f:
+            return json.load(f).get("address")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _save_cached_mac(address):
+    """Remember the gateway address for the next run (best effort)"""
+    try:
+        os.makedirs(os.path.dirname(KNOWN_DEVICE_FILE), exist_ok=True)
+        with open(KNOWN_DEVICE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"address": address}, f)
+    except OSError:
+        pass
+
+
+# =============================================================================
+# Lightweight Gateway Client (plain output, for standalone scripts)
+# =============================================================================
+class BLEClient:
+    """Gateway client with MTU-sized writes and event-driven response waits
+
+    Subclasses report results by overriding handle_response(),
+    handle_invalid(), handle_status() and handle_link_lost().
+    """
+
+    # Let wait_response() return once the top-level status has streamed in
+    # (needs ijson; otherwise the whole response is awaited)
+    EARLY_STATUS = False
+
+    def __init__(self):
+        self.client = None
+        self.connected = False
+        self.response_buffer = bytearray()  # Parsed once at <END>
+        self.chunk_size = 18  # Raised to the negotiated MTU on connect
+        self._write_response = True  # Cleared if the gateway allows write commands
+        self._response_ready = asyncio.Event()  # Set by the parser
+        self._link_lost = asyncio.Event()  # Set when the gateway drops the link
+        # Fragments waiting to be parsed outside the notification callback
+        self._parse_queue = asyncio.Queue()
+        self._parser_task = None
+
+    async def connect_cached(self, timeout=3.0):
+        """Connect straight to the last gateway used, skipping the scan
+
+        Returns False if no address is cached or the gateway did not answer
+        within timeout seconds; callers then fall back to find_gateway().
+        """
+        address = _load_cached_mac()
+        if not address:
+            return False
+        try:
+            await self.connect_to(address, timeout)
+        except Exception:
+            await self.disconnect()
+            return False
+        return True
+
+    async def connect_to(self, address, timeout=10.0):
+        """Connect to a gateway address and subscribe to responses"""
+        # Nothing from an earlier link carries over into this one
+        if self._parser_task:
+            self._parser_task.cancel()
+            self._parser_task = None
+        self._link_lost.clear()
+        self._response_ready.clear()
+        self.response_buffer.clear()
+        self._parse_queue = asyncio.Queue()
+        self.client = BleakClient(address, disconnected_callback=self._on_disconnect)
+        await self.client.connect(timeout=timeout)
+        self._parser_task = asyncio.create_task(self._parser())
+        await self.client.start_notify(RESPONSE_CHAR_UUID, self._notification_handler)
+        # One ATT write carries MTU - 3 bytes of payload
+        self.chunk_size = max(self.chunk_size, self.client.mtu_size - 3)
+        # Use write-without-response only if the characteristic offers it
+        # (current firmware exposes PROPERTY_WRITE only)
+        char = self.client.services.get_characteristic(COMMAND_CHAR_UUID)
+        self._write_response = not (
+            char and "write-without-response" in char.properties
+        )
+        self.connected = True
+        _save_cached_mac(address)
+
+    async def disconnect(self):
+        """Close the link; returns True if a live connection was closed"""
+        if self._parser_task:
+            self._parser_task.cancel()
+            self._parser_task = None
+        self.connected = False  # Expected; keeps _on_disconnect quiet
+        # Also covers a connect_to() that failed after the link came up
+        if not (self.client and self.client.is_connected):
+            return False
+        await self.client.disconnect()
+        return True
+
+    def _on_disconnect(self, client):
+        """Bleak callback; the gateway drops the link when it restarts"""
+        if self.connected:
+            self.connected = False
+            self.handle_link_lost()
+        self._link_lost.set()
+
+    async def wait_for_disconnect(self, timeout):
+        """Wait until the gateway drops the link; True if it did in time"""
+        try:
+            await asyncio.wait_for(self._link_lost.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def write_payload(self, payload, on_fragment=None):
+        """Write a serialized command in MTU-sized fragments, then <END>
+
+        on_fragment(number, total, size) is called before each fragment.
+        """
+        if not self.connected:
+            raise RuntimeError("Not connected to BLE device")
+
+        self._response_ready.clear()
+
+        # No sleeps between fragments; the BLE stack provides flow control.
+        # memoryview slices are zero-copy views; bleak accepts any buffer.
+        view = memoryview(payload)
+        chunk_size = self.chunk_size
+        total = (len(view) + chunk_size - 1) // chunk_size
+        response = self._write_response
+        for number, i in enumerate(range(0, len(view), chunk_size), 1):
+            chunk = view[i : i + chunk_size]
+            if on_fragment:
+                on_fragment(number, total, len(chunk))
+            await self.client.write_gatt_char(
+                COMMAND_CHAR_UUID, chunk, response=response
+            )
+
+        # Send end marker, acknowledged so it also flushes queued commands
+        await self.client.write_gatt_char(COMMAND_CHAR_UUID, END_MARKER, response=True)
+
+    async def wait_response(self, timeout):
+        """Wait for the response to the last write; False on timeout"""
+        try:
+            await asyncio.wait_for(self._response_ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _notification_handler(self, sender, data):
+        """Handle BLE notification responses (enqueue only)"""
+        self._parse_queue.put_nowait(bytes(data))
+
+    async def _parser(self):
+        """Reassemble and report responses outside the notification callback"""
+        scan = IJSON_AVAILABLE and self.EARLY_STATUS
+        events = ijson.sendable_list() if scan else None
+        stream = ijson.parse_coro(events) if scan else None
+        while True:
+            data = await self._parse_queue.get()
+            if data != END_MARKER:
+                self.response_buffer.extend(data)
+                if stream is not None:
+                    stream = self._scan_status(stream, events, data)
+                continue
+
+            raw = bytes(self.response_buffer)
+            self.response_buffer.clear()
+            if scan:
+                del events[:]
+                stream = ijson.parse_coro(events)
+            if raw:
+                try:
+                    response = _loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                    self.handle_invalid(raw, e)
+                else:
+                    self.handle_response(response, raw)
+            self._response_ready.set()
+
+    def _scan_status(self, stream, events, data):
+        """Feed one fragment to the incremental parser
+
+        Returns the parser, or None once the status is reported or the
+        stream is unparseable (the full parse at <END> reports errors).
+        """
+        try:
+            stream.send(data)
+        except ijson.JSONError:
+            return None
+        for prefix, event, value in events:
+            if prefix == "status" and event == "string":
+                self.handle_status(value)
+                self._response_ready.set()
+                return None
+        del events[:]
+        return stream
+
+    def handle_response(self, response, raw):
+        """Report a complete response; raw is the payload as received"""
+        print(f"Response: {json.dumps(response, indent=2)}")
+
+    def handle_invalid(self, raw, error):
+        """Report a response that is not valid JSON"""
+        print(f"Invalid JSON response: {raw.decode('utf-8', 'replace')}")
+
+    def handle_status(self, status):
+        """Report the status of a response still streaming in (EARLY_STATUS)"""
+
+    def handle_link_lost(self):
+        """Report an unexpected disconnect"""
+        print("Connection closed by device")
+
+
 # =============================================================================
 # BLE Device Client Class
 # =============================================================================
+def _batch_rejected(response):
+    """Whether a register batch's first response rejects the whole batch
+
+    Register errors carry type "registers"; anything else is the gateway
+    refusing the batch itself (e.g. an unknown op), and nothing follows it.
+    """
+    return response.get("status") == "error" and response.get("type") != "registers"
+
+
 class BLEDeviceClient:
     """BLE client for communicating with SRT-MGATE-1210 Gateway"""
 
     def __init__(self):
         self.client = None
         self.device = None
-        self.response_buffer = []  # Use list for chunks
+        self.response_buffer = bytearray()  # Parsed once at <END>
+        self.responses = []  # Complete responses to the command in flight
+        self._expected_responses = 1  # Batches answer once per sub-command
+        self._ends_early = None  # Checks a batch's first response, see send_command
         self.response_complete = asyncio.Event()
+        self.chunk_size = 18  # Raised to the negotiated MTU on connect
+        self._progress = None  # Shared Rich spinner, built on first use
+
+    @contextlib.contextmanager
+    def _spinner(self, description):
+        """Run a block under a transient spinner, yielding (progress, task)
+
+        One Progress display is built on first use and restarted per block;
+        it is stopped in between so plain output and input() are not
+        captured by a live display.
+        """
+        if self._progress is None:
+            _load_rich()
+            self._progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console,
+                transient=True,
+            )
+        with self._progress as progress:
+            task = progress.add_task(description, total=None)
+            try:
+                yield progress, task
+            finally:
+                progress.remove_task(task)
 
     def _is_target_device(self, name):
         """Check if device name matches our target patterns"""
-        if not name:
-            return False
+        return is_gateway_name(name)
 
-        # v1.0.0+: MGate-1210(P)-XXXX or MGate-1210-XXXX
-        if name.startswith(DEVICE_NAME_PREFIX):
-            return True
+    async def _scan(self, timeout, stop_after=None, on_found=None):
+        """Collect gateways from advertisements as they arrive
 
-        # v2.5.31: SURIOTA-XXXXXX
-        if name.startswith(DEVICE_NAME_LEGACY_PREFIX):
-            return True
+        Stops once stop_after gateways are found, else after timeout
+        seconds. on_found(count) is called for each new gateway. Returns
+        (device, rssi) pairs, strongest signal first.
+        """
+        found = {}  # address -> (device, rssi), latest advertisement wins
+        found_event = asyncio.Event()
+
+        def detection_callback(device, adv):
+            if not self._is_target_device(device.name):
+                return
+            is_new = device.address not in found
+            found[device.address] = (device, adv.rssi)
+            if not is_new:
+                return
+            if on_found:
+                on_found(len(found))
+            if stop_after and len(found) >= stop_after:
+                found_event.set()
+
+        # Active scanning is bleak's fastest discovery setting: it selects
+        # SCAN_MODE_LOW_LATENCY on Android, and BlueZ already scans LE only
+        # with DuplicateData off. Spelled out so it is not lost to a default.
+        scanner = BleakScanner(
+            detection_callback=detection_callback, scanning_mode="active"
+        )
+        await scanner.start()
+        try:
+            await asyncio.wait_for(found_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await scanner.stop()
 
-        # Legacy: SURIOTA GW
-        if name == DEVICE_NAME_LEGACY:
-            return True
+        # Strongest signal first, so the selection menu leads with the
+        # nearest gateway
+        return sorted(found.values(), key=lambda entry: entry[1], reverse=True)
 
-        return False
+    async def scan_all_devices(self, timeout=10, stop_after=None):
+        """Scan for all MGate devices and return list
 
-    async def scan_all_devices(self, timeout=10):
-        """Scan for all MGate devices and return list"""
-        print_info(f"Scanning for MGate devices... (timeout: {timeout}s)")
+        Args:
+            timeout: Scan timeout in seconds
+            stop_after: Return as soon as this many devices are found
+                        instead of waiting out the full timeout
+        """
+        found = await self._scan_with_progress(timeout, stop_after)
+        return [device for device, rssi in found]
 
-        found_devices = []
+    async def _scan_with_progress(self, timeout, stop_after):
+        """_scan() behind the scanning message/spinner; (device, rssi) pairs"""
+        print_info(f"Scanning for MGate devices... (timeout: {timeout}s)")
 
         if RICH_AVAILABLE:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-                transient=True,
-            ) as progress:
-                task = progress.add_task("Scanning BLE devices...", total=None)
-                devices = await BleakScanner.discover(timeout=timeout)
-
-                for device in devices:
-                    if self._is_target_device(device.name):
-                        found_devices.append(device)
-                        progress.update(
-                            task, description=f"Found {len(found_devices)} device(s)..."
-                        )
-        else:
-            devices = await BleakScanner.discover(timeout=timeout)
-            for device in devices:
-                if self._is_target_device(device.name):
-                    found_devices.append(device)
+            with self._spinner("Scanning BLE devices...") as (progress, task):
+
+                def on_found(count):
+                    progress.update(task, description=f"Found {count} device(s)...")
+
+                return await self._scan(timeout, stop_after, on_found)
+
+        return await self._scan(timeout, stop_after)
+
+    def _render_device_rows(self, found):
+        """Format (index, name, address, RSSI) cells for the selection menu
+
+        found holds the (device, rssi) pairs from _scan(); the RSSI comes
+        from the advertisement, as BLEDevice.rssi is deprecated in bleak.
+        """
+        rows = []
+        for idx, (device, rssi) in enumerate(found, 1):
+            rssi_str = f"{rssi} dBm" if rssi is not None else "N/A"
+            rows.append((str(idx), device.name or "Unknown", device.address, rssi_str))
+        return rows
 
-        return found_devices
+    async def _select_device(self, found):
+        """Display device selection menu and return selected device
 
-    def _select_device(self, devices):
-        """Display device selection menu and return selected device"""
-        if not devices:
+        found holds (device, rssi) pairs as returned by _scan().
+        """
+        if not found:
             return None
+        devices = [device for device, rssi in found]
 
         if len(devices) == 1:
             print_info(f"Found 1 gateway: {devices[0].name}")
@@ -481,31 +902,26 @@ class BLEDeviceClient:
         print_info(f"Found {len(devices)} gateways:")
         print()
 
+        rows = self._render_device_rows(found)
         if RICH_AVAILABLE:
+            _load_rich()
             table = Table(title="Available Gateways", box=ROUNDED, border_style="cyan")
             table.add_column("#", justify="center", style="bold yellow", width=4)
             table.add_column("Name", style="bold white")
             table.add_column("MAC Address", style="cyan")
             table.add_column("RSSI", justify="right", style="dim")
 
-            for idx, device in enumerate(devices, 1):
-                rssi = getattr(device, "rssi", "N/A")
-                rssi_str = f"{rssi} dBm" if rssi != "N/A" else "N/A"
-                table.add_row(
-                    str(idx), device.name or "Unknown", device.address, rssi_str
-                )
+            for row in rows:
+                table.add_row(*row)
 
             console.print(table)
         else:
             print("  +-----+------------------------+-------------------+----------+")
             print("  |  #  | Name                   | MAC Address       | RSSI     |")
             print("  +-----+------------------------+-------------------+----------+")
-            for idx, device in enumerate(devices, 1):
-                rssi = getattr(device, "rssi", "N/A")
-                rssi_str = f"{rssi} dBm" if rssi != "N/A" else "N/A"
-                name = (device.name or "Unknown")[:22]
+            for idx, name, address, rssi_str in rows:
                 print(
-                    f"  | {idx:^3} | {name:<22} | {device.address:<17} | {rssi_str:<8} |"
+                    f"  | {idx:^3} | {name[:22]:<22} | {address:<17} | {rssi_str:<8} |"
                 )
             print("  +-----+------------------------+-------------------+----------+")
 
@@ -524,7 +940,7 @@ class BLEDeviceClient:
                 else:
                     print(f"  Select gateway (1-{len(devices)}): ", end="")
 
-                choice = input().strip()
+                choice = (await _ainput()).strip()
 
                 if choice.lower() == "q":
                     print_info("Selection cancelled")
@@ -555,35 +971,46 @@ class BLEDeviceClient:
             auto_select: If True, automatically select first device found (legacy behavior)
                         If False, show selection menu when multiple devices found
         """
-        devices = await self.scan_all_devices(timeout)
+        # auto_select takes the first gateway heard, so stop scanning there
+        found = await self._scan_with_progress(
+            timeout, stop_after=1 if auto_select else None
+        )
 
-        if not devices:
+        if not found:
             return None
 
         if auto_select:
             # Legacy behavior - return first device
-            return devices[0]
+            return found[0][0]
 
         # New behavior - let user select
-        return self._select_device(devices)
+        return await self._select_device(found)
 
     def _notification_handler(self, sender, data):
         """Handle BLE notifications"""
-        try:
-            chunk = data.decode("utf-8")
-
-            # Check for end marker
-            if chunk == "<END>":
+        # Check for end marker
+        if data == END_MARKER:
+            raw = bytes(self.response_buffer)
+            self.responses.append(raw)
+            self.response_buffer.clear()
+            if len(self.responses) >= self._expected_responses or (
+                len(self.responses) == 1 and self._first_ends_early(raw)
+            ):
                 self.response_complete.set()
-            else:
-                self.response_buffer.append(chunk)
-                # Show progress dot
-                if RICH_AVAILABLE:
-                    console.print(".", end="", style="cyan")
-                else:
-                    print(".", end="", flush=True)
-        except Exception as e:
-            print_warning(f"Notification decode error: {e}")
+        else:
+            self.response_buffer.extend(data)
+            # Show progress dot
+            sys.stdout.write(_PROGRESS_DOT)
+            sys.stdout.flush()
+
+    def _first_ends_early(self, raw):
+        """Whether the first response means no further responses will follow"""
+        if not self._ends_early:
+            return False
+        try:
+            return self._ends_early(_loads(raw))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return False
 
     async def connect(self, timeout=10, auto_select=False):
         """Connect to MGate device
@@ -608,14 +1035,7 @@ class BLEDeviceClient:
 
         try:
             if RICH_AVAILABLE:
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=console,
-                    transient=True,
-                ) as progress:
-                    task = progress.add_task("Connecting...", total=None)
-
+                with self._spinner("Connecting...") as (progress, task):
                     self.client = BleakClient(self.device.address)
                     await self.client.connect()
 
@@ -631,6 +1051,10 @@ class BLEDeviceClient:
                     RESPONSE_CHAR_UUID, self._notification_handler
                 )
 
+            # One ATT write carries MTU - 3 bytes of payload; bleak has no
+            # MTU request, the OS negotiates the largest MTU on connect
+            self.chunk_size = max(self.chunk_size, self.client.mtu_size - 3)
+
             print_success("Connected and subscribed to notifications")
             return True
 
@@ -638,50 +1062,74 @@ class BLEDeviceClient:
             print_error(f"Connection failed: {e}")
             return False
 
-    async def send_command(self, command, timeout=30):
-        """Send command and wait for response"""
+    async def send_command(
+        self, command, timeout=30, expected_responses=None, ends_early=None
+    ):
+        """Send command and wait for response
+
+        command is the JSON text, or bytes from encode_command(). Batch
+        commands are answered once per sub-command; pass their count as
+        expected_responses to get a list of responses instead. If
+        ends_early(first_response) is true, the list stops at that response
+        (e.g. the gateway rejected the batch as a whole).
+        """
         if not self.client or not self.client.is_connected:
             print_error("Not connected")
             return None
 
         # Reset buffer
-        self.response_buffer = []
+        self.response_buffer.clear()
+        self.responses.clear()
+        self._expected_responses = expected_responses or 1
+        self._ends_early = ends_early
         self.response_complete.clear()
 
         try:
-            # Send command in chunks (18 bytes like original)
-            cmd_bytes = command.encode("utf-8")
-            chunk_size = 18
+            # Send command in MTU-sized chunks
+            if isinstance(command, str):
+                cmd_bytes = command.encode("utf-8")
+            else:
+                cmd_bytes = command
+            chunk_size = self.chunk_size
 
             print_info(f"Sending command...")
 
-            for i in range(0, len(cmd_bytes), chunk_size):
-                chunk = cmd_bytes[i : i + chunk_size]
-                await self.client.write_gatt_char(COMMAND_CHAR_UUID, chunk)
-                await asyncio.sleep(0.05)
+            # Acknowledged writes give backpressure; no fixed delay needed.
+            # memoryview slices are zero-copy views; bleak accepts any buffer.
+            view = memoryview(cmd_bytes)
+            for i in range(0, len(view), chunk_size):
+                await self.client.write_gatt_char(
+                    COMMAND_CHAR_UUID, view[i : i + chunk_size], response=True
+                )
 
             # Send end marker
-            await self.client.write_gatt_char(COMMAND_CHAR_UUID, b"<END>")
+            await self.client.write_gatt_char(
+                COMMAND_CHAR_UUID, END_MARKER, response=True
+            )
 
             # Wait for response
             try:
                 await asyncio.wait_for(self.response_complete.wait(), timeout=timeout)
                 print()  # New line after dots
 
-                # Join buffer and parse JSON
-                full_response = "".join(self.response_buffer)
-                return json.loads(full_response)
+                # Parse the raw bytes (orjson when installed)
+                responses = [_loads(raw) for raw in self.responses]
+                return responses if expected_responses else responses[0]
 
             except asyncio.TimeoutError:
                 print()
                 print_warning(f"Response timeout after {timeout}s")
+                if expected_responses:
+                    print_info(
+                        f"Received {len(self.responses)}/{expected_responses} responses"
+                    )
                 if self.response_buffer:
-                    partial = "".join(self.response_buffer)
+                    partial = self.response_buffer.decode("utf-8", "replace")
                     print_info(f"Partial response: {partial[:100]}...")
                 return None
-            except json.JSONDecodeError as e:
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
                 print()
-                full_response = "".join(self.response_buffer)
+                full_response = b"".join(self.responses).decode("utf-8", "replace")
                 print_error(f"Invalid JSON response: {e}")
                 print_info(f"Raw response: {full_response[:200]}...")
                 return None
@@ -693,19 +1141,12 @@ class BLEDeviceClient:
     async def create_device(self, config, name=""):
         """Create a new Modbus device"""
         # Correct command format: op, type, device_id, config
-        cmd = json.dumps(
-            {"op": "create", "type": "device", "device_id": None, "config": config},
-            separators=(",", ":"),
+        cmd = encode_command(
+            {"op": "create", "type": "device", "device_id": None, "config": config}
         )
 
         if RICH_AVAILABLE:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-                transient=True,
-            ) as progress:
-                task = progress.add_task(f"Creating device: {name}...", total=None)
+            with self._spinner(f"Creating device: {name}..."):
                 response = await self.send_command(cmd)
         else:
             print_info(f"Creating device: {name}...")
@@ -725,14 +1166,13 @@ class BLEDeviceClient:
     async def create_register(self, device_id, config, name=""):
         """Create a new register for a device"""
         # Correct command format: op, type, device_id, config
-        cmd = json.dumps(
+        cmd = encode_command(
             {
                 "op": "create",
                 "type": "register",
                 "device_id": device_id,
                 "config": config,
-            },
-            separators=(",", ":"),
+            }
         )
 
         response = await self.send_command(cmd, timeout=15)
@@ -746,17 +1186,78 @@ class BLEDeviceClient:
             print_warning(f"Register creation issue: {error}")
             return False
 
+    async def create_registers_batch(self, device_id, configs, batch_size=20):
+        """Create registers with sequential batch commands
+
+        One transfer per batch_size registers instead of one command round
+        trip each; batch_size keeps a command well inside the gateway's
+        16 KB command buffer. Falls back to create_register() per config if
+        the gateway rejects the batch op.
+
+        Returns:
+            list: One bool per config, True if the register was created
+        """
+        results = []
+        for start in range(0, len(configs), batch_size):
+            group = configs[start : start + batch_size]
+            cmd = encode_command(
+                {
+                    "op": "batch",
+                    "mode": "sequential",
+                    "commands": [
+                        {
+                            "op": "create",
+                            "type": "register",
+                            "device_id": device_id,
+                            "config": config,
+                        }
+                        for config in group
+                    ],
+                }
+            )
+
+            # Each created register takes a flash write on the gateway
+            responses = await self.send_command(
+                cmd,
+                timeout=15 + len(group),
+                expected_responses=len(group),
+                ends_early=_batch_rejected,
+            )
+
+            if responses is None:
+                # Timed out; judge by the responses that did arrive
+                try:
+                    responses = [_loads(raw) for raw in self.responses]
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    responses = []
+
+            if responses and _batch_rejected(responses[0]):
+                print_warning("Batch create not accepted, creating one by one")
+                for config in configs[start:]:
+                    results.append(await self.create_register(device_id, config))
+                return results
+
+            for response in responses:
+                ok = response.get("status") == "ok"
+                if not ok:
+                    error = response.get("message", "Unknown error")
+                    print_warning(f"Register creation issue: {error}")
+                results.append(ok)
+            # Registers without a response are reported as failed
+            results.extend([False] * (len(group) - len(responses)))
+
+        return results
+
     async def update_register(self, device_id, register_id, config):
         """Update an existing register configuration (v1.0.8+)"""
-        cmd = json.dumps(
+        cmd = encode_command(
             {
                 "op": "update",
                 "type": "register",
                 "device_id": device_id,
                 "register_id": register_id,
                 "config": config,
-            },
-            separators=(",", ":"),
+            }
         )
 
         response = await self.send_command(cmd, timeout=15)
@@ -781,15 +1282,14 @@ class BLEDeviceClient:
         Returns:
             tuple: (success: bool, response: dict)
         """
-        cmd = json.dumps(
+        cmd = encode_command(
             {
                 "op": "write",
                 "type": "register",
                 "device_id": device_id,
                 "register_id": register_id,
                 "value": value,
-            },
-            separators=(",", ":"),
+            }
         )
 
         print_info(f"Writing value {value} to {device_id}/{register_id}...")
@@ -810,13 +1310,12 @@ class BLEDeviceClient:
 
     async def read_registers(self, device_id):
         """Read all registers for a device"""
-        cmd = json.dumps(
+        cmd = encode_command(
             {
                 "op": "read",
                 "type": "register",
                 "device_id": device_id,
-            },
-            separators=(",", ":"),
+            }
         )
 
         response = await self.send_command(cmd, timeout=15)
@@ -844,27 +1343,55 @@ class BLEDeviceClient:
 # =============================================================================
 # Utility Functions
 # =============================================================================
+async def _ainput(prompt=""):
+    """input() that keeps the event loop free for BLE callbacks
+
+    Reads on a daemon thread rather than asyncio.to_thread(), whose worker
+    would hold up interpreter exit after Ctrl+C until a line is entered.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(line, error):
+        if future.done():
+            return
+        if error is None:
+            future.set_result(line)
+        else:
+            future.set_exception(error)
+
+    def read():
+        try:
+            line = input(prompt)
+        except Exception as e:  # EOFError on closed stdin
+            loop.call_soon_threadsafe(resolve, None, e)
+        else:
+            loop.call_soon_threadsafe(resolve, line, None)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 def format_bytes(size):
     """Format bytes to human readable"""
-    for unit in ["B", "KB", "MB", "GB"]:
-        if size < 1024:
-            return f"{size:.1f} {unit}"
-        size /= 1024
-    return f"{size:.1f} TB"
+    # Unit index straight from the bit length: each unit is 10 more bits
+    whole = int(size)
+    unit = min((whole.bit_length() - 1) // 10, 4) if whole > 0 else 0
+    return f"{size / (1 << (10 * unit)):.1f} {_BYTE_UNITS[unit]}"
 
 
 def format_duration(seconds):
     """Format seconds to human readable duration"""
     if seconds < 60:
         return f"{seconds:.1f}s"
-    elif seconds < 3600:
-        mins = seconds // 60
-        secs = seconds % 60
-        return f"{int(mins)}m {int(secs)}s"
-    else:
-        hours = seconds // 3600
-        mins = (seconds % 3600) // 60
-        return f"{int(hours)}h {int(mins)}m"
+    hours, rem = divmod(int(seconds), 3600)
+    mins, secs = divmod(rem, 60)
+    if hours:
+        return f"{hours}h {mins}m"
+    return f"{mins}m {secs}s"
 
 
 # =============================================================================
@@ -872,14 +1399,20 @@ def format_duration(seconds):
 # =============================================================================
 __all__ = [
     # BLE
+    "BLEClient",
     "BLEDeviceClient",
     "SERVICE_UUID",
     "COMMAND_CHAR_UUID",
     "RESPONSE_CHAR_UUID",
+    "END_MARKER",
     "DEVICE_NAME_PREFIX",
     "DEVICE_NAME_LEGACY_PREFIX",
     "DEVICE_NAME_LEGACY",
     "check_dependencies",
+    "encode_command",
+    "find_gateway",
+    "is_gateway_name",
+    "is_gateway_advertisement",
     # Note: BLEDeviceClient now supports gateway selection:
     #   - scan_all_devices(timeout): Returns list of all found gateways
     #   - scan_for_device(timeout, auto_select=False): Shows selection menu
@@ -898,6 +1431,7 @@ __all__ = [
     "print_box",
     "print_summary",
     "countdown",
+    "acountdown",
     "create_progress",
     # Utilities
     "format_bytes",
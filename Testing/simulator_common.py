@@ -19,6 +19,9 @@ Dependencies:
 =============================================================================
 """
 
+import functools
+import importlib
+import importlib.util
 import sys
 import time
 from datetime import datetime
@@ -401,27 +404,23 @@ def print_ready_message(protocol, config):
         print()
 
 
-def print_dependencies():
-    """Print dependency check info"""
+@functools.lru_cache(maxsize=1)
+def _probe_dependencies():
+    """(package, version, ok) per dependency; probed once per process"""
     deps = []
 
-    # Check pymodbus
-    try:
-        import pymodbus
-
-        version = getattr(pymodbus, "__version__", "unknown")
-        deps.append(("pymodbus", version, True))
-    except ImportError:
-        deps.append(("pymodbus", "NOT FOUND", False))
-
-    # Check pyserial
-    try:
-        import serial
-
-        version = getattr(serial, "__version__", "unknown")
-        deps.append(("pyserial", version, True))
-    except ImportError:
-        deps.append(("pyserial", "NOT FOUND", False))
+    # Check pymodbus and pyserial; find_spec skips the import when absent
+    for package, module in (("pymodbus", "pymodbus"), ("pyserial", "serial")):
+        if importlib.util.find_spec(module) is None:
+            deps.append((package, "NOT FOUND", False))
+            continue
+        try:
+            imported = importlib.import_module(module)
+        except ImportError:
+            deps.append((package, "NOT FOUND", False))
+        else:
+            version = getattr(imported, "__version__", "unknown")
+            deps.append((package, version, True))
 
     # Check rich
     if RICH_AVAILABLE:
@@ -429,6 +428,13 @@ def print_dependencies():
     else:
         deps.append(("rich", "NOT FOUND (optional)", False))
 
+    return tuple(deps)
+
+
+def print_dependencies():
+    """Print dependency check info"""
+    deps = _probe_dependencies()
+
     if RICH_AVAILABLE:
         table = Table(title="Dependencies", box=SIMPLE, border_style="dim")
         table.add_column("Package", style="white")
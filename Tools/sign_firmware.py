@@ -30,6 +30,11 @@ This naming convention:
 
 Usage:
     python sign_firmware.py <input.bin> [private_key.pem] [version] [variant]
+    python sign_firmware.py --variants P, <poe.bin> <non_poe.bin> [private_key.pem] [version]
+
+    Unchanged firmware (same SHA-256 as firmware_manifest.json, signature
+    valid for the given key) keeps its existing signature; add --force to
+    sign it again.
 
 Example:
     python sign_firmware.py ../Main/build/Main.ino.bin
@@ -41,25 +46,34 @@ Output:
     - Console output with signature and checksum
 
 Requirements:
-    pip install ecdsa
+    pip install cryptography   (or the slower pure-Python: pip install ecdsa)
 
 Copyright (c) 2026 Suriota IoT Solutions
 """
 
+import functools
 import hashlib
 import json
 import os
+import queue
+import re
 import shutil
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Signing backend (cryptography, else ecdsa) is imported by _load_backend()
+# on first use, so --help and argument errors don't pay for it
+CRYPTOGRAPHY_AVAILABLE = False
+
+# Optional: orjson encodes the manifest faster (same indent=2 layout)
 try:
-    from ecdsa import SigningKey, NIST256p
-    from ecdsa.util import sigencode_der  # For DER/ASN.1 format (mbedtls compatible)
+    import orjson
+
+    ORJSON_AVAILABLE = True
 except ImportError:
-    print("Error: ecdsa module not found")
-    print("Install with: pip install ecdsa")
-    sys.exit(1)
+    ORJSON_AVAILABLE = False
 
 # ============================================================================
 # PRODUCT CONFIGURATION - Must match ProductConfig.h
@@ -75,6 +89,25 @@ DEFAULT_VARIANT = "P"
 # Minimum supported version for OTA
 MIN_VERSION = "0.1.0"
 
+# Static part of the manifest "product" block; build_manifest() fills in
+# "model" per variant (in place, so the key order is kept)
+_PRODUCT_STATIC = {
+    "name": PRODUCT_FULL_NAME,
+    "model": PRODUCT_MODEL,
+    "manufacturer": MANUFACTURER,
+    "copyright": COPYRIGHT,
+}
+
+# Firmware is read and hashed in chunks of this size (1 MiB, in line with
+# OS readahead); smaller files are hashed without the reader thread
+HASH_CHUNK_SIZE = 1 << 20
+
+# Chunks the reader thread may run ahead of the hasher
+HASH_QUEUE_DEPTH = 4
+
+# Firmware versions are MAJOR.MINOR.PATCH
+_VER_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)")
+
 
 def generate_firmware_filename(version, variant=""):
     """
@@ -92,99 +125,210 @@ def generate_firmware_filename(version, variant=""):
         return f"{PRODUCT_MODEL}_v{version}.bin"
 
 
-def sign_firmware(firmware_path, private_key_path, version=None, variant=None):
-    """Sign firmware and generate manifest"""
+@functools.lru_cache(maxsize=None)
+def _load_backend():
+    """Import the signing backend on first use"""
+    global CRYPTOGRAPHY_AVAILABLE, hashes, serialization, ec, utils
+    global SigningKey, VerifyingKey, sigencode_der, sigdecode_der
 
-    print("=" * 60)
-    print("OTA Firmware Signing Tool")
-    print("=" * 60)
+    # Preferred: cryptography signs through OpenSSL's native P-256 code
+    try:
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, utils
 
-    # Check files exist
-    if not os.path.exists(firmware_path):
-        print(f"Error: Firmware file not found: {firmware_path}")
-        sys.exit(1)
+        CRYPTOGRAPHY_AVAILABLE = True
+        return
+    except ImportError:
+        pass
 
-    if not os.path.exists(private_key_path):
-        print(f"Error: Private key not found: {private_key_path}")
-        print("Run generate_ota_keys.py first to create keys")
+    # Fallback: pure-Python ecdsa for existing installations
+    try:
+        from ecdsa import SigningKey, VerifyingKey
+
+        # For DER/ASN.1 format (mbedtls compatible)
+        from ecdsa.util import sigencode_der, sigdecode_der
+    except ImportError:
+        print("Error: neither cryptography nor ecdsa module found")
+        print("Install with: pip install cryptography")
         sys.exit(1)
 
-    # Load private key
-    print(f"\n[1/5] Loading private key: {private_key_path}")
+
+@functools.lru_cache(maxsize=4)
+def _load_key(private_key_path, mtime_ns):
+    _load_backend()
     with open(private_key_path, "rb") as f:
-        private_key = SigningKey.from_pem(f.read())
+        pem = f.read()
+    if CRYPTOGRAPHY_AVAILABLE:
+        return serialization.load_pem_private_key(pem, password=None)
+    return SigningKey.from_pem(pem)
 
-    # Read firmware
-    print(f"[2/5] Reading firmware: {firmware_path}")
-    with open(firmware_path, "rb") as f:
-        firmware_data = f.read()
 
-    firmware_size = len(firmware_data)
-    print(
-        f"       Firmware size: {firmware_size:,} bytes ({firmware_size/1024/1024:.2f} MB)"
-    )
+def load_private_key(private_key_path):
+    """
+    Load the ECDSA P-256 private key from a PEM file.
 
-    # Calculate SHA-256 hash (for manifest checksum field)
-    print("[3/5] Calculating SHA-256 checksum...")
-    firmware_hash = hashlib.sha256(firmware_data).digest()
-    hash_hex = firmware_hash.hex()
-    print(f"       SHA-256: {hash_hex}")
+    The parsed key is cached per path and modification time, so repeated
+    signings in one run parse the PEM once and a rewritten key file is
+    picked up.
+    """
+    return _load_key(private_key_path, os.stat(private_key_path).st_mtime_ns)
 
-    # Sign the firmware DATA (not the hash!) - ecdsa.sign_deterministic hashes internally
-    # This ensures both Python and mbedtls compute SHA256(firmware_data) before signing/verifying
-    print("[4/5] Signing firmware data...")
-    signature = private_key.sign_deterministic(
-        firmware_data, hashfunc=hashlib.sha256, sigencode=sigencode_der
-    )
-    signature_hex = signature.hex()
-    print(
-        f"       Signature ({len(signature)} bytes, DER format): {signature_hex[:64]}..."
+
+def _read_chunks(f, chunks):
+    """Reader thread: queue the file in HASH_CHUNK_SIZE chunks, then None"""
+    try:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            chunks.put(chunk)
+    except OSError as e:
+        chunks.put(e)
+        return
+    chunks.put(None)
+
+
+def hash_file(path):
+    """
+    SHA-256 of a file in one pass.
+
+    Python 3.11+ streams the file through hashlib.file_digest, which reads
+    into a reused buffer in C without allocating a bytes object per chunk.
+    Older versions use a reader thread that reads the next chunk while this
+    thread hashes the current one (hashlib releases the GIL on large
+    buffers), so wall time approaches max(I/O, hash) instead of their sum.
+    """
+    if hasattr(hashlib, "file_digest"):
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").digest()
+
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HASH_CHUNK_SIZE:
+            # A single chunk: the thread would only add overhead
+            hasher.update(f.read())
+            return hasher.digest()
+
+        chunks = queue.Queue(maxsize=HASH_QUEUE_DEPTH)
+        reader = threading.Thread(target=_read_chunks, args=(f, chunks), daemon=True)
+        reader.start()
+        while (chunk := chunks.get()) is not None:
+            if isinstance(chunk, OSError):
+                raise chunk
+            hasher.update(chunk)
+        reader.join()
+    return hasher.digest()
+
+
+def _fast_copy(src_path, dst_path):
+    """
+    Copy file data inside the kernel: os.copy_file_range (a reflink on
+    btrfs/XFS), else shutil.copyfile (which uses os.sendfile on Linux).
+    """
+    if hasattr(os, "copy_file_range"):
+        with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+            size = os.fstat(src.fileno()).st_size
+            copied = 0
+            try:
+                while n := os.copy_file_range(src.fileno(), dst.fileno(), size):
+                    copied += n
+                return
+            except OSError:
+                # Unsupported by this kernel/filesystem: fall back below
+                if copied:
+                    raise
+    shutil.copyfile(src_path, dst_path)
+
+
+def copy_and_hash(src_path, dst_path):
+    """
+    Copy firmware to its release name (with metadata, like shutil.copy2)
+    and return its SHA-256. The hash is the only pass over the data in
+    Python; the copy itself never leaves the kernel.
+    """
+    firmware_hash = hash_file(src_path)
+    if os.path.exists(dst_path) and os.path.samefile(src_path, dst_path):
+        # Already named properly; opening it for writing would truncate it
+        return firmware_hash
+
+    _fast_copy(src_path, dst_path)
+    shutil.copystat(src_path, dst_path)
+    return firmware_hash
+
+
+def sign_digest(private_key, digest):
+    """
+    Sign the SHA-256 digest of the firmware as-is (no second hash!).
+
+    Signing SHA256(firmware_data) directly gives the same signature mbedtls
+    verifies against SHA256(firmware_data), so the firmware is hashed once.
+
+    Returns the signature in DER/ASN.1 format (mbedtls compatible).
+    """
+    if CRYPTOGRAPHY_AVAILABLE:
+        return private_key.sign(digest, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+    return private_key.sign_digest_deterministic(
+        digest, hashfunc=hashlib.sha256, sigencode=sigencode_der
     )
 
-    # Determine version
-    if version is None:
-        version = input("\nEnter firmware version (e.g., 1.0.0): ").strip()
-        if not version:
-            version = "1.0.0"
 
-    # Determine variant
-    if variant is None:
-        variant = input(
-            f"Enter variant (P=POE, empty=Non-POE) [{DEFAULT_VARIANT}]: "
-        ).strip()
-        if not variant:
-            variant = DEFAULT_VARIANT
+def verify_digest(public_key, digest, signature):
+    """
+    Check a DER signature against the SHA-256 digest of the firmware, as
+    mbedtls does on the device. Raises if the signature does not verify.
+    """
+    if CRYPTOGRAPHY_AVAILABLE:
+        public_key.verify(signature, digest, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+    else:
+        public_key.verify_digest(signature, digest, sigdecode=sigdecode_der)
+
 
-    # Parse version to build number (MAJOR*1000 + MINOR*100 + PATCH)
+def _public_key(private_key):
+    """Public half of a key returned by load_private_key"""
+    if CRYPTOGRAPHY_AVAILABLE:
+        return private_key.public_key()
+    return private_key.get_verifying_key()
+
+
+def _parse_build_number(version):
+    """
+    Parse version to build number (MAJOR*1000 + MINOR*100 + PATCH)
+
+    Raises ValueError if the version is not MAJOR.MINOR.PATCH.
+    """
+    m = _VER_RE.fullmatch(version)
+    if m is None:
+        raise ValueError(
+            f"Invalid version '{version}' (expected MAJOR.MINOR.PATCH, e.g. 1.0.0)"
+        )
+    major, minor, patch = map(int, m.groups())
+    return major * 1000 + minor * 100 + patch
+
+
+def _check_version(version):
+    """Exit with an error before any firmware is read if version is malformed"""
     try:
-        parts = version.split(".")
-        build_number = int(parts[0]) * 1000 + int(parts[1]) * 100 + int(parts[2])
-    except:
-        build_number = 1000
+        _parse_build_number(version)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    # Generate proper firmware filename
-    output_filename = generate_firmware_filename(version, variant)
-    output_dir = os.path.dirname(firmware_path)
-    output_path = os.path.join(output_dir, output_filename)
 
-    # Copy/rename firmware to proper name
-    print(f"[5/6] Copying firmware with proper naming...")
-    print(f"       {os.path.basename(firmware_path)} -> {output_filename}")
-    shutil.copy2(firmware_path, output_path)
+@functools.lru_cache(maxsize=None)
+def _release_date():
+    """Today's date, fixed once per run so every manifest of a batch agrees"""
+    return datetime.now().strftime("%Y-%m-%d")
 
-    # Generate manifest
-    print("[6/6] Generating firmware_manifest.json...")
 
-    manifest = {
+def build_manifest(
+    version, variant, output_filename, firmware_size, hash_hex, signature_hex
+):
+    """Build the firmware_manifest.json content for one signed binary"""
+    return {
         "product": {
-            "name": PRODUCT_FULL_NAME,
+            **_PRODUCT_STATIC,
             "model": f"{PRODUCT_MODEL}({variant})" if variant else PRODUCT_MODEL,
-            "manufacturer": MANUFACTURER,
-            "copyright": COPYRIGHT,
         },
         "version": version,
-        "build_number": build_number,
-        "release_date": datetime.now().strftime("%Y-%m-%d"),
+        "build_number": _parse_build_number(version),
+        "release_date": _release_date(),
         "min_version": MIN_VERSION,
         "firmware": {
             "filename": output_filename,
@@ -196,21 +340,159 @@ def sign_firmware(firmware_path, private_key_path, version=None, variant=None):
         "mandatory": False,
     }
 
-    # Save manifest
+
+def _write_lines(lines):
+    """Emit several console lines with a single write"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def dump_manifest(manifest):
+    """Serialize a manifest once, for both the file and the console echo"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(manifest, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(manifest, indent=2)
+
+
+def _signed_manifest(
+    manifest_path, version, output_filename, firmware_hash, private_key
+):
+    """
+    The manifest already at manifest_path if it was written for this exact
+    firmware (same SHA-256, version and filename) and its signature verifies
+    with the current key (so a rotated key forces a new signature), else None
+    """
+    try:
+        with open(manifest_path, "rb") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict):
+        return None
+    firmware = manifest.get("firmware")
+    if not isinstance(firmware, dict):
+        return None
+    if (
+        firmware.get("sha256") != firmware_hash.hex()
+        or firmware.get("filename") != output_filename
+        or manifest.get("version") != version
+    ):
+        return None
+
+    try:
+        signature = bytes.fromhex(firmware["signature"])
+        verify_digest(_public_key(private_key), firmware_hash, signature)
+    except Exception:
+        return None
+    return manifest
+
+
+def sign_firmware(
+    firmware_path,
+    private_key_path,
+    version=None,
+    variant=None,
+    private_key=None,
+    force=False,
+):
+    """
+    Sign firmware and generate manifest
+
+    private_key: an already loaded key (e.g. from load_private_key) to skip
+    loading private_key_path again when signing several binaries.
+    force: sign even if firmware_manifest.json already covers this firmware.
+    """
+
+    _write_lines(["=" * 60, "OTA Firmware Signing Tool", "=" * 60])
+
+    # Check files exist
+    if not os.path.exists(firmware_path):
+        print(f"Error: Firmware file not found: {firmware_path}")
+        sys.exit(1)
+
+    if private_key is None and not os.path.exists(private_key_path):
+        print(f"Error: Private key not found: {private_key_path}")
+        print("Run generate_ota_keys.py first to create keys")
+        sys.exit(1)
+
+    # Determine version
+    if version is None:
+        version = input("\nEnter firmware version (e.g., 1.0.0): ").strip()
+        if not version:
+            version = "1.0.0"
+
+    # Determine variant
+    if variant is None:
+        variant = input(
+            f"Enter variant (P=POE, empty=Non-POE) [{DEFAULT_VARIANT}]: "
+        ).strip()
+        if not variant:
+            variant = DEFAULT_VARIANT
+
+    _check_version(version)
+    _load_backend()
+
+    # Generate proper firmware filename
+    output_filename = generate_firmware_filename(version, variant)
+    output_dir = os.path.dirname(firmware_path)
+    output_path = os.path.join(output_dir, output_filename)
     manifest_path = os.path.join(output_dir, "firmware_manifest.json")
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
 
-    print(f"       Saved: {manifest_path}")
-    print(f"       Firmware: {output_path}")
+    # Read firmware
+    print(f"\n[1/5] Reading firmware: {firmware_path}")
+    firmware_size = os.path.getsize(firmware_path)
+    print(
+        f"       Firmware size: {firmware_size:,} bytes ({firmware_size/1024/1024:.2f} MB)"
+    )
 
-    # Print summary
-    print("\n" + "=" * 60)
-    print("SIGNING COMPLETE!")
-    print("=" * 60)
+    # Copy/rename firmware to proper name and calculate SHA-256 hash (for
+    # manifest checksum field)
+    print("[2/5] Copying firmware with proper naming + SHA-256 checksum...")
+    print(f"       {os.path.basename(firmware_path)} -> {output_filename}")
+    firmware_hash = copy_and_hash(firmware_path, output_path)
+    hash_hex = firmware_hash.hex()
+    print(f"       SHA-256: {hash_hex}")
 
+    # Load private key
+    print(f"[3/5] Loading private key: {private_key_path}")
+    if private_key is None:
+        private_key = load_private_key(private_key_path)
+
+    # Unchanged firmware signed with this key: the existing signature holds
+    if not force:
+        manifest = _signed_manifest(
+            manifest_path, version, output_filename, firmware_hash, private_key
+        )
+        if manifest is not None:
+            _write_lines(
+                [
+                    "       Firmware unchanged since it was last signed;",
+                    f"       reusing the signature in {manifest_path}",
+                    "       (use --force to sign again)",
+                ]
+            )
+            return manifest, output_path
+
+    # Sign the digest computed above instead of re-hashing the firmware
+    print("[4/5] Signing firmware digest...")
+    signature = sign_digest(private_key, firmware_hash)
+    signature_hex = signature.hex()
     print(
-        f"""
+        f"       Signature ({len(signature)} bytes, DER format): {signature_hex[:64]}..."
+    )
+
+    # Generate manifest
+    manifest = build_manifest(
+        version, variant, output_filename, firmware_size, hash_hex, signature_hex
+    )
+
+    # Save manifest
+    manifest_text = dump_manifest(manifest)
+    with open(manifest_path, "w") as f:
+        f.write(manifest_text)
+
+    # Print result and summary in one write
+    summary = f"""
 Output Files:
   1. Firmware: {output_path}
   2. Manifest: {manifest_path}
@@ -234,33 +516,154 @@ Upload to GitHub OTA Repository:
 
 Manifest content:
 """
+    _write_lines(
+        [
+            "[5/5] Generating firmware_manifest.json...",
+            f"       Saved: {manifest_path}",
+            f"       Firmware: {output_path}",
+            "",
+            "=" * 60,
+            "SIGNING COMPLETE!",
+            "=" * 60,
+            summary,
+            manifest_text,
+        ]
     )
-    print(json.dumps(manifest, indent=2))
 
     return manifest, output_path
 
 
+def sign_firmware_batch(
+    firmware_paths, variants, private_key_path, version=None, force=False
+):
+    """
+    Sign several variant binaries of one release in a single run.
+
+    The binaries are copied and hashed concurrently (hashlib releases the GIL
+    while hashing, so the files are processed in parallel); the private key is
+    loaded once and each digest is signed in turn. Each variant's manifest is
+    written next to its binary, so the variants must live in separate folders.
+    Variants whose manifest already covers their firmware are not re-signed
+    unless force is set.
+    """
+
+    _write_lines(["=" * 60, "OTA Firmware Signing Tool (batch)", "=" * 60])
+
+    if len(firmware_paths) != len(variants):
+        print(f"Error: {len(variants)} variants but {len(firmware_paths)} binaries")
+        sys.exit(1)
+
+    # Check files exist
+    for firmware_path in firmware_paths:
+        if not os.path.exists(firmware_path):
+            print(f"Error: Firmware file not found: {firmware_path}")
+            sys.exit(1)
+
+    if not os.path.exists(private_key_path):
+        print(f"Error: Private key not found: {private_key_path}")
+        print("Run generate_ota_keys.py first to create keys")
+        sys.exit(1)
+
+    # Determine version (shared by all variants)
+    if version is None:
+        version = input("\nEnter firmware version (e.g., 1.0.0): ").strip()
+        if not version:
+            version = "1.0.0"
+
+    _check_version(version)
+    _load_backend()
+
+    output_dirs = [os.path.dirname(path) for path in firmware_paths]
+    if len(set(output_dirs)) != len(output_dirs):
+        print("Error: each variant needs its own folder (one manifest per folder)")
+        sys.exit(1)
+
+    output_filenames = [generate_firmware_filename(version, v) for v in variants]
+    output_paths = [
+        os.path.join(d, name) for d, name in zip(output_dirs, output_filenames)
+    ]
+
+    manifest_paths = [os.path.join(d, "firmware_manifest.json") for d in output_dirs]
+
+    # Copy/rename all variants and calculate their SHA-256 hashes in parallel
+    print(f"\n[1/4] Copying + hashing {len(firmware_paths)} firmware variants...")
+    with ThreadPoolExecutor(max_workers=len(firmware_paths)) as executor:
+        firmware_hashes = list(
+            executor.map(copy_and_hash, firmware_paths, output_paths)
+        )
+
+    # Load private key (once for all variants)
+    print(f"[2/4] Loading private key: {private_key_path}")
+    private_key = load_private_key(private_key_path)
+
+    # Unchanged variants signed with this key keep their existing signature
+    existing = [
+        None if force else _signed_manifest(path, version, name, h, private_key)
+        for path, name, h in zip(manifest_paths, output_filenames, firmware_hashes)
+    ]
+    if all(existing):
+        print("       All variants unchanged since they were last signed")
+
+    # Sign each digest
+    print("[3/4] Signing firmware digests...")
+    signatures = [
+        None if manifest else sign_digest(private_key, h)
+        for manifest, h in zip(existing, firmware_hashes)
+    ]
+
+    # Generate one manifest per variant
+    lines = ["[4/4] Generating firmware_manifest.json files..."]
+    results = []
+    for i, variant in enumerate(variants):
+        output_path = output_paths[i]
+        hash_hex = firmware_hashes[i].hex()
+        label = variant or "Non-POE"
+        manifest_path = manifest_paths[i]
+        if existing[i]:
+            lines.append(f"       [{label}] Unchanged, reusing: {manifest_path}")
+            results.append((existing[i], output_path))
+            continue
+
+        manifest = build_manifest(
+            version,
+            variant,
+            output_filenames[i],
+            os.path.getsize(output_path),
+            hash_hex,
+            signatures[i].hex(),
+        )
+        with open(manifest_path, "w") as f:
+            f.write(dump_manifest(manifest))
+
+        lines.append(f"       [{label}] Firmware: {output_path}")
+        lines.append(f"       [{label}] Manifest: {manifest_path}")
+        lines.append(f"       [{label}] SHA-256: {hash_hex}")
+        results.append((manifest, output_path))
+
+    lines += ["", "=" * 60, "SIGNING COMPLETE!", "=" * 60]
+    _write_lines(lines)
+
+    return results
+
+
 def verify_signature(firmware_path, public_key_path, signature_hex):
     """Verify firmware signature (for testing)"""
 
     print("\nVerifying signature...")
+    _load_backend()
 
     with open(public_key_path, "rb") as f:
-        from ecdsa import VerifyingKey
-        from ecdsa.util import sigdecode_der  # For DER/ASN.1 format
-
-        public_key = VerifyingKey.from_pem(f.read())
-
-    with open(firmware_path, "rb") as f:
-        firmware_data = f.read()
+        pem = f.read()
 
+    firmware_hash = hash_file(firmware_path)
     signature = bytes.fromhex(signature_hex)
 
     try:
-        # Verify against firmware DATA (not hash) - ecdsa.verify hashes internally
-        public_key.verify(
-            signature, firmware_data, hashfunc=hashlib.sha256, sigdecode=sigdecode_der
-        )
+        if CRYPTOGRAPHY_AVAILABLE:
+            public_key = serialization.load_pem_public_key(pem)
+        else:
+            public_key = VerifyingKey.from_pem(pem)
+        verify_digest(public_key, firmware_hash, signature)
         print("Signature verification: PASSED")
         return True
     except Exception as e:
@@ -281,6 +684,8 @@ if __name__ == "__main__":
         )
         print("  version        : Firmware version (e.g., 1.0.0)")
         print("  variant        : Hardware variant (P=POE, empty=Non-POE)")
+        print("  --variants     : Sign one binary per variant in a single run")
+        print("  --force        : Sign even if the firmware is unchanged")
         print("\nExamples:")
         print("  python sign_firmware.py ../Main/build/Main.ino.bin")
         print(
@@ -289,29 +694,55 @@ if __name__ == "__main__":
         print(
             "  python sign_firmware.py ../Main/build/Main.ino.bin OTA_Keys/ota_private_key.pem 1.0.0 P"
         )
+        print(
+            "  python sign_firmware.py --variants P, build_poe/Main.ino.bin build/Main.ino.bin OTA_Keys/ota_private_key.pem 1.0.0"
+        )
         print("\nOutput Naming Convention:")
         print("  Format: {MODEL}_{VARIANT}_v{VERSION}.bin")
         print("  Example: MGATE-1210_P_v1.0.0.bin (POE variant)")
         print("  Example: MGATE-1210_v1.0.0.bin (Non-POE variant)")
         sys.exit(1)
 
-    firmware_path = sys.argv[1]
+    args = sys.argv[1:]
+
+    # --force -> sign even if firmware_manifest.json already covers the firmware
+    force = "--force" in args
+    if force:
+        args.remove("--force")
+
+    # --variants P, -> the first N arguments are the binaries, one per variant
+    variants = None
+    if "--variants" in args:
+        i = args.index("--variants")
+        variants = args[i + 1].split(",")
+        del args[i : i + 2]
+        firmware_paths, args = args[: len(variants)], args[len(variants) :]
+    else:
+        firmware_path, args = args[0], args[1:]
 
     # Default private key location is OTA_Keys folder (relative to script)
     script_dir = os.path.dirname(os.path.abspath(__file__))
     default_key = os.path.join(script_dir, "OTA_Keys", "ota_private_key.pem")
 
-    private_key_path = sys.argv[2] if len(sys.argv) > 2 else default_key
-    version = sys.argv[3] if len(sys.argv) > 3 else None
-    variant = sys.argv[4] if len(sys.argv) > 4 else None
+    private_key_path = args[0] if len(args) > 0 else default_key
+    version = args[1] if len(args) > 1 else None
 
-    manifest, output_path = sign_firmware(
-        firmware_path, private_key_path, version, variant
-    )
+    if variants is not None:
+        results = sign_firmware_batch(
+            firmware_paths, variants, private_key_path, version, force=force
+        )
+    else:
+        variant = args[2] if len(args) > 2 else None
+        results = [
+            sign_firmware(
+                firmware_path, private_key_path, version, variant, force=force
+            )
+        ]
 
     # Optional: verify if public key exists
     public_key_path = private_key_path.replace("private", "public")
     if os.path.exists(public_key_path):
-        verify_signature(
-            output_path, public_key_path, manifest["firmware"]["signature"]
-        )
+        for manifest, output_path in results:
+            verify_signature(
+                output_path, public_key_path, manifest["firmware"]["signature"]
+            )
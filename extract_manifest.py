@@ -1,51 +1,190 @@
+"""
+Build the GitHub OTA manifest from the manifest written by sign_firmware.py
+
+Usage:
+    python extract_manifest.py [--version 2.5.27] [--release-date 2025-12-02]
+                               [--changelog "..." ...]
+    python extract_manifest.py --pattern "Main/build/**/firmware_manifest.json"
+
+Version, build number, release date and changelog are derived from the
+source manifest (or the CLI) instead of being edited in by hand. With
+--pattern, every matching manifest is converted, one worker process each,
+and written next to its source as github_<source name>.
+"""
+
+import argparse
+import glob
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+# Shared with the signing tool so the build number is computed the same way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Tools"))
+
+from sign_firmware import _parse_build_number, dump_manifest
+
+SOURCE_MANIFEST = "Main/build/esp32.esp32.esp32s3/firmware_manifest.json"
+MIN_VERSION = "2.3.0"
+RELEASE_URL = (
+    "https://api.github.com/repos/GifariKemal/GatewaySuriotaOTA/contents/"
+    "releases/v{version}/firmware.bin?ref=main"
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--manifest", default=SOURCE_MANIFEST, help="source manifest")
+    parser.add_argument(
+        "--pattern",
+        help="glob of source manifests to convert in parallel "
+        "(each keeps its own version and is written next to its source; "
+        "--version/--output don't apply)",
+    )
+    parser.add_argument("--version", help="release version (default: from manifest)")
+    parser.add_argument(
+        "--release-date",
+        default=date.today().isoformat(),
+        help="release date YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument("--min-version", default=MIN_VERSION)
+    parser.add_argument(
+        "--changelog",
+        action="append",
+        help="changelog line, repeatable (default: from manifest)",
+    )
+    parser.add_argument(
+        "--output", help="output file (default: firmware_manifest_v{version}.json)"
+    )
+    return parser.parse_args()
+
+
+def extract_manifest(
+    source_path, version, release_date, min_version, changelog, output_path
+):
+    """
+    Read one source manifest and write its GitHub manifest.
+
+    Returns (report, output_path); the report is printed by the caller so
+    parallel workers don't interleave their output.
+    """
+    # Read manifest
+    with open(source_path, "rb") as f:
+        manifest = json.load(f)
+
+    version = version or manifest["version"]
+    build_number = _parse_build_number(version)
+    output_path = output_path or f"firmware_manifest_v{version}.json"
+
+    # Each field on separate line
+    report = "\n".join(
+        [
+            "=" * 80,
+            f"FIRMWARE v{manifest['version']} MANIFEST",
+            "=" * 80,
+            f"Version: {manifest['version']}",
+            f"Build Number: {manifest['build_number']}",
+            f"Release Date: {manifest['release_date']}",
+            f"Size: {manifest['firmware']['size']} bytes",
+            "",
+            "SHA256:",
+            manifest["firmware"]["sha256"],
+            "",
+            "Signature:",
+            manifest["firmware"]["signature"],
+            "",
+            "=" * 80,
+        ]
+    )
+
+    # Also save to a clean file for GitHub
+    github_manifest = {
+        "version": version,
+        "build_number": build_number,
+        "release_date": release_date,
+        "min_version": min_version,
+        "firmware": {
+            "url": RELEASE_URL.format(version=version),
+            "filename": "firmware.bin",
+            "size": manifest["firmware"]["size"],
+            "sha256": manifest["firmware"]["sha256"],
+            "signature": manifest["firmware"]["signature"],
+        },
+        "changelog": changelog or manifest.get("changelog", []),
+        "mandatory": False,
+    }
+
+    with open(output_path, "w") as f:
+        f.write(dump_manifest(github_manifest))
+
+    return report, output_path
+
+
+def _pattern_output(source_path):
+    """
+    Output path for a --pattern source: next to it, so variants of one
+    version (same build, separate folders) don't share a file
+    """
+    head, tail = os.path.split(source_path)
+    return os.path.join(head, f"github_{tail}")
+
+
+def _extract_from(args, source_path):
+    """Pool worker entry point (module-level so it can be pickled)"""
+    return extract_manifest(
+        source_path,
+        None,
+        args.release_date,
+        args.min_version,
+        args.changelog,
+        _pattern_output(source_path),
+    )
+
+
+def main():
+    args = parse_args()
+
+    try:
+        if args.pattern:
+            # glob.glob also takes absolute patterns, unlike Path().glob
+            source_paths = sorted(glob.glob(args.pattern, recursive=True))
+            if not source_paths:
+                sys.exit(f"Error: no manifest matches '{args.pattern}'")
+            # Each worker must own its output: no shared target, and no
+            # output that is another worker's source
+            targets = {os.path.realpath(_pattern_output(p)) for p in source_paths}
+            sources = {os.path.realpath(p) for p in source_paths}
+            if len(targets) != len(source_paths) or targets & sources:
+                sys.exit(
+                    "Error: --pattern matches manifests whose outputs collide "
+                    "(with each other or with another match); narrow the pattern"
+                )
+            # One worker per manifest; each reads, converts and writes its own
+            with ProcessPoolExecutor() as executor:
+                results = list(
+                    executor.map(
+                        _extract_from, [args] * len(source_paths), source_paths
+                    )
+                )
+        else:
+            results = [
+                extract_manifest(
+                    args.manifest,
+                    args.version,
+                    args.release_date,
+                    args.min_version,
+                    args.changelog,
+                    args.output,
+                )
+            ]
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    for report, output_path in results:
+        print(report)
+        print(f"GitHub manifest saved to: {output_path}")
+
 
-# Read manifest
-with open("Main/build/esp32.esp32.esp32s3/firmware_manifest.json", "r") as f:
-    manifest = json.load(f)
-
-# Print each field on separate line
-print("=" * 80)
-print("FIRMWARE v2.5.20 MANIFEST")
-print("=" * 80)
-print(f"Version: {manifest['version']}")
-print(f"Build Number: {manifest['build_number']}")
-print(f"Release Date: {manifest['release_date']}")
-print(f"Size: {manifest['firmware']['size']} bytes")
-print()
-print("SHA256:")
-print(manifest["firmware"]["sha256"])
-print()
-print("Signature:")
-print(manifest["firmware"]["signature"])
-print()
-print("=" * 80)
-
-# Also save to a clean file for GitHub
-# Also save to a clean file for GitHub
-github_manifest = {
-    "version": "2.5.27",
-    "build_number": 2527,
-    "release_date": "2025-12-02",
-    "min_version": "2.3.0",
-    "firmware": {
-        "url": "https://api.github.com/repos/GifariKemal/GatewaySuriotaOTA/contents/releases/v2.5.27/firmware.bin?ref=main",
-        "filename": "firmware.bin",
-        "size": manifest["firmware"]["size"],
-        "sha256": manifest["firmware"]["sha256"],
-        "signature": manifest["firmware"]["signature"],
-    },
-    "changelog": [
-        "v2.5.27: Stable - Robust OTA with Resume & WDT Fixes",
-        "- Implemented HTTP Range Resume for slow connections",
-        "- Fixed over-downloading issue during resume",
-        "- Added Watchdog Timeout (WDT) prevention",
-    ],
-    "mandatory": False,
-}
-
-with open("firmware_manifest_v2.5.27.json", "w") as f:
-    json.dump(github_manifest, f, indent=2)
-
-print("GitHub manifest saved to: firmware_manifest_v2.5.27.json")
+if __name__ == "__main__":
+    main()